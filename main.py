@@ -16,6 +16,11 @@ from src.core.config import Config
 from src.core.logger import get_logger
 from src.ui.enhanced_cli import EnhancedCLI
 
+try:
+    import uvloop
+except ImportError:  # Optional performance dependency
+    uvloop = None
+
 logger = get_logger(__name__)
 
 
@@ -47,10 +52,9 @@ class TerraformAgentApp:
             # Print streaming text without newline
             self.cli.console.print(text, end="", markup=False)
 
-        # Register the callback with the AI processor
-        if hasattr(self.agent.ai_processor, "set_stream_callback"):
-            self.agent.ai_processor.set_stream_callback(stream_callback)
-            logger.info("Streaming callback registered successfully")
+        # Register the callback with the agent, which hands it to the AI processor
+        self.agent.set_stream_callback(stream_callback)
+        logger.info("Streaming callback registered successfully")
 
     async def run(self):
         """Run the main application"""
@@ -119,8 +123,9 @@ class TerraformAgentApp:
             # Only show response if it wasn't already streamed
             if not self.streaming_started:
                 # Show command processing
-                last_command = self.agent.get_conversation_history()[-1]["content"]
-                self.cli.show_command_processing(last_command)
+                history = self.agent.get_conversation_history()
+                if history:
+                    self.cli.show_command_processing(history[-1]["content"])
 
                 # Show typing indicator and response
                 with self.cli.console.status(
@@ -219,6 +224,7 @@ class TerraformAgentApp:
         conversation_history = self.agent.get_conversation_history()
         self.cli.show_goodbye(session_duration, conversation_history)
         self.agent.stop()
+        await self.agent.aclose()
 
 
 async def async_main():
@@ -238,7 +244,9 @@ def main():
         # Try to get the running event loop
         loop = asyncio.get_running_loop()
     except RuntimeError:
-        # No event loop is running, use asyncio.run()
+        # No event loop is running; prefer uvloop's libuv-backed loop when installed
+        if uvloop is not None:
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
         asyncio.run(async_main())
     else:
         # Event loop is already running, schedule the coroutine
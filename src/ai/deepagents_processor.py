@@ -3,8 +3,10 @@ DeepAgents processor for multi-agent IaC orchestration
 """
 
 import asyncio
-from typing import Any, Dict, List, Optional
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
 
+import httpx
 from deepagents import create_deep_agent
 from langchain_core.tools import BaseTool
 from langgraph.types import Checkpointer
@@ -17,36 +19,22 @@ from src.terraform.cli import TerraformCLI
 logger = get_logger(__name__)
 
 
-class DeepAgentsProcessor:
-    """DeepAgents-based processor for multi-agent IaC workflows"""
+@dataclass(frozen=True)
+class SubAgentSpec:
+    """Static definition of a specialized sub-agent"""
 
-    def __init__(self, config: Config, terraform_tools: List[BaseTool]):
-        self.config = config
-        self.terraform_tools = terraform_tools
-        self.terraform_cli = TerraformCLI(
-            terraform_path=config.terraform_path,
-            working_dir=config.terraform_dir
-        )
-        
-        # Initialize the model
-        self.model = ModelFactory.create_model(config)
-        
-        # Create specialized sub-agents
-        self.subagents = self._create_subagents()
-        
-        # Create the main deep agent
-        self.agent = self._create_deep_agent()
-        
-        logger.info(f"DeepAgents processor initialized with {len(self.subagents)} sub-agents")
+    name: str
+    description: str
+    prompt: str
+    tool_factory: str  # Name of the DeepAgentsProcessor method building the extra tool
 
-    def _create_subagents(self) -> List[Dict[str, Any]]:
-        """Create specialized sub-agents for IaC workflows"""
-        
-        # Security and Compliance Sub-agent
-        security_auditor = {
-            "name": "security-auditor",
-            "description": "Analyze security configurations and compliance requirements. Reviews Terraform configurations for security best practices, vulnerabilities, and compliance with frameworks like CIS, NIST, SOC2.",
-            "prompt": """You are a security and compliance expert specializing in Infrastructure as Code.
+
+SUBAGENT_SPECS: Tuple[SubAgentSpec, ...] = (
+    # Security and Compliance Sub-agent
+    SubAgentSpec(
+        name="security-auditor",
+        description="Analyze security configurations and compliance requirements. Reviews Terraform configurations for security best practices, vulnerabilities, and compliance with frameworks like CIS, NIST, SOC2.",
+        prompt="""You are a security and compliance expert specializing in Infrastructure as Code.
 
 Your responsibilities:
 1. Review Terraform configurations for security vulnerabilities
@@ -63,14 +51,13 @@ Focus on:
 - Compliance with industry standards and regulations
 
 Always provide specific, actionable recommendations with references to security best practices.""",
-            "tools": self.terraform_tools + [self._create_security_scan_tool()],
-        }
-
-        # Cost Optimization Sub-agent
-        cost_optimizer = {
-            "name": "cost-optimizer",
-            "description": "Optimize infrastructure costs and resource sizing. Analyzes resource utilization, recommends cost-effective alternatives, and implements cost-saving strategies.",
-            "prompt": """You are a cloud cost optimization expert specializing in Infrastructure as Code.
+        tool_factory="_create_security_scan_tool",
+    ),
+    # Cost Optimization Sub-agent
+    SubAgentSpec(
+        name="cost-optimizer",
+        description="Optimize infrastructure costs and resource sizing. Analyzes resource utilization, recommends cost-effective alternatives, and implements cost-saving strategies.",
+        prompt="""You are a cloud cost optimization expert specializing in Infrastructure as Code.
 
 Your responsibilities:
 1. Analyze Terraform configurations for cost optimization opportunities
@@ -87,14 +74,13 @@ Focus on:
 - Licensing and software costs
 
 Provide detailed cost breakdowns and ROI analysis for your recommendations.""",
-            "tools": self.terraform_tools + [self._create_cost_analysis_tool()],
-        }
-
-        # Deployment Validator Sub-agent
-        deployment_validator = {
-            "name": "deployment-validator",
-            "description": "Validate infrastructure deployments and run post-deployment checks. Ensures deployments are successful, resources are properly configured, and systems are operational.",
-            "prompt": """You are an infrastructure deployment and validation expert.
+        tool_factory="_create_cost_analysis_tool",
+    ),
+    # Deployment Validator Sub-agent
+    SubAgentSpec(
+        name="deployment-validator",
+        description="Validate infrastructure deployments and run post-deployment checks. Ensures deployments are successful, resources are properly configured, and systems are operational.",
+        prompt="""You are an infrastructure deployment and validation expert.
 
 Your responsibilities:
 1. Validate Terraform plans before execution
@@ -111,14 +97,13 @@ Focus on:
 - Performance baseline establishment
 
 Create comprehensive validation checklists and testing procedures for each deployment.""",
-            "tools": self.terraform_tools + [self._create_validation_tool()],
-        }
-
-        # Migration Planner Sub-agent
-        migration_planner = {
-            "name": "migration-planner",
-            "description": "Plan infrastructure migrations and transitions. Designs migration strategies, rollback procedures, and transition plans for infrastructure changes.",
-            "prompt": """You are an infrastructure migration specialist with expertise in complex cloud migrations.
+        tool_factory="_create_validation_tool",
+    ),
+    # Migration Planner Sub-agent
+    SubAgentSpec(
+        name="migration-planner",
+        description="Plan infrastructure migrations and transitions. Designs migration strategies, rollback procedures, and transition plans for infrastructure changes.",
+        prompt="""You are an infrastructure migration specialist with expertise in complex cloud migrations.
 
 Your responsibilities:
 1. Design migration strategies from current to target infrastructure states
@@ -135,10 +120,49 @@ Focus on:
 - Migration testing and validation procedures
 
 Provide comprehensive migration playbooks with risk assessments and contingency plans.""",
-            "tools": self.terraform_tools + [self._create_migration_planning_tool()],
-        }
+        tool_factory="_create_migration_planning_tool",
+    ),
+)
+
+
+class DeepAgentsProcessor:
+    """DeepAgents-based processor for multi-agent IaC workflows"""
+
+    def __init__(
+        self,
+        config: Config,
+        terraform_tools: List[BaseTool],
+        http_client: Optional[httpx.AsyncClient] = None,
+    ):
+        self.config = config
+        self.terraform_tools = terraform_tools
+        self.terraform_cli = TerraformCLI(
+            terraform_path=config.terraform_path,
+            working_dir=config.terraform_dir
+        )
+        
+        # Initialize the model
+        self.model = ModelFactory.create_model(config, http_async_client=http_client)
+        
+        # Create specialized sub-agents
+        self.subagents = self._create_subagents()
+        
+        # Create the main deep agent
+        self.agent = self._create_deep_agent()
+        
+        logger.info(f"DeepAgents processor initialized with {len(self.subagents)} sub-agents")
 
-        return [security_auditor, cost_optimizer, deployment_validator, migration_planner]
+    def _create_subagents(self) -> List[Dict[str, Any]]:
+        """Create specialized sub-agents for IaC workflows"""
+        return [
+            {
+                "name": spec.name,
+                "description": spec.description,
+                "prompt": spec.prompt,
+                "tools": [*self.terraform_tools, getattr(self, spec.tool_factory)()],
+            }
+            for spec in SUBAGENT_SPECS
+        ]
 
     def _create_deep_agent(self):
         """Create the main DeepAgents orchestrator"""
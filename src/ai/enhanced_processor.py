@@ -3,7 +3,9 @@ Enhanced AI processor that uses OpenAI Compatible endpoints and DeepAgents
 """
 
 import asyncio
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
 
 from src.ai.openai_processor import OpenAIProcessor
 from src.ai.deepagents_processor import DeepAgentsProcessor
@@ -23,6 +25,17 @@ class EnhancedAIProcessor:
         self.openai_processor = None
         self.deepagents_processor = None
         self.query_classifier = QueryClassifier()
+        self.tool_handlers: Dict[str, Callable] = {}
+
+        # Shared HTTP connection pool reused by every backend (keep-alive across requests)
+        self._http = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=100,
+                max_keepalive_connections=100,
+                keepalive_expiry=60.0,
+            ),
+            timeout=60.0,
+        )
 
         # Initialize processors based on configuration
         self._initialize_processors()
@@ -34,10 +47,10 @@ class EnhancedAIProcessor:
         try:
             if self.config.ai_provider in ["openai", "openai_compatible"]:
                 if self.config.ai_provider == "openai" and self.config.openai_api_key:
-                    self.openai_processor = OpenAIProcessor(self.config)
+                    self.openai_processor = OpenAIProcessor(self.config, http_client=self._http)
                     logger.info("OpenAI processor initialized")
                 elif self.config.ai_provider == "openai_compatible":
-                    self.openai_processor = OpenAIProcessor(self.config)
+                    self.openai_processor = OpenAIProcessor(self.config, http_client=self._http)
                     logger.info("OpenAI Compatible processor initialized")
                 else:
                     logger.warning("OpenAI processor not initialized (missing API key)")
@@ -58,7 +71,9 @@ class EnhancedAIProcessor:
         """Initialize DeepAgents processor with terraform tools"""
         if self.config.use_deepagents:
             try:
-                self.deepagents_processor = DeepAgentsProcessor(self.config, terraform_tools)
+                self.deepagents_processor = DeepAgentsProcessor(
+                    self.config, terraform_tools, http_client=self._http
+                )
                 logger.info("DeepAgents processor initialized successfully")
             except Exception as e:
                 logger.error(f"Failed to initialize DeepAgents processor: {e}")
@@ -193,7 +208,7 @@ class EnhancedAIProcessor:
         """Get information about the current model configuration"""
         return ModelFactory.get_model_info(self.config)
 
-    def register_tool_handler(self, tool_name: str, handler: callable):
+    def register_tool_handler(self, tool_name: str, handler: Callable):
         """
         Register a tool handler for compatibility with existing DZP code
         
@@ -201,10 +216,6 @@ class EnhancedAIProcessor:
             tool_name: Name of the tool
             handler: Handler function for the tool
         """
-        # Store tool handlers for potential future use
-        if not hasattr(self, 'tool_handlers'):
-            self.tool_handlers = {}
-        
         self.tool_handlers[tool_name] = handler
         logger.info(f"Registered tool handler: {tool_name}")
 
@@ -219,8 +230,25 @@ class EnhancedAIProcessor:
         Returns:
             Processed response as string
         """
+        response, _ = await self.process_query_with_status(query, project_data)
+        return response
+
+    async def process_query_with_status(
+        self, query: str, project_data: Optional[Dict[str, Any]] = None
+    ) -> Tuple[str, bool]:
+        """
+        Process a query like process_query, also reporting whether it succeeded
+
+        Args:
+            query: The user's query
+            project_data: Optional project context data
+
+        Returns:
+            Tuple of (response text, False if the processor reported an error)
+        """
         try:
             result = await self.process_request(query, project_data)
+            succeeded = not (isinstance(result, dict) and "error" in result)
             
             # Extract the response content from the result
             if isinstance(result, dict) and "messages" in result:
@@ -228,16 +256,21 @@ class EnhancedAIProcessor:
                 if messages and len(messages) > 0:
                     last_message = messages[-1]
                     if hasattr(last_message, 'content'):
-                        return last_message.content
+                        return last_message.content, succeeded
                     elif isinstance(last_message, dict) and "content" in last_message:
-                        return last_message["content"]
+                        return last_message["content"], succeeded
             
             # Fallback: return string representation
-            return str(result)
+            return str(result), succeeded
             
         except Exception as e:
             logger.error(f"Error processing query: {e}")
-            return f"Error processing query: {str(e)}"
+            return f"Error processing query: {str(e)}", False
+
+    async def aclose(self):
+        """Close the shared HTTP connection pool"""
+        await self._http.aclose()
+        ModelFactory.clear_cache()
 
     def clear_memory(self):
         """Clear processor memory (for compatibility)"""
@@ -249,7 +282,7 @@ class EnhancedAIProcessor:
     async def test_connection(self) -> Dict[str, Any]:
         """Test connection to the configured AI provider"""
         try:
-            model = ModelFactory.create_model(self.config)
+            model = ModelFactory.create_model(self.config, http_async_client=self._http)
             
             # Simple test message
             test_messages = [{"role": "user", "content": "Hello! This is a connection test."}]
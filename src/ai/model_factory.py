@@ -2,8 +2,9 @@
 Model factory for supporting OpenAI and OpenAI Compatible providers
 """
 
-from typing import Any, Optional
+from typing import Any, Dict, Optional, Tuple
 
+import httpx
 from langchain_core.language_models import BaseLanguageModel
 from langchain_openai import ChatOpenAI
 
@@ -16,13 +17,22 @@ logger = get_logger(__name__)
 class ModelFactory:
     """Factory for creating AI model instances based on configuration"""
 
+    # Model instances shared by every caller with identical settings
+    _model_cache: Dict[Tuple[Any, ...], BaseLanguageModel] = {}
+
     @staticmethod
-    def create_model(config: Config) -> BaseLanguageModel:
+    def create_model(
+        config: Config, http_async_client: Optional[httpx.AsyncClient] = None
+    ) -> BaseLanguageModel:
         """
         Create an AI model instance based on the provider configuration
+
+        Instances are shared across callers with the same settings so that
+        their HTTP clients and connection pools are reused.
         
         Args:
             config: Application configuration
+            http_async_client: Optional shared async HTTP client for connection reuse
             
         Returns:
             Configured language model instance
@@ -33,16 +43,43 @@ class ModelFactory:
         provider = config.ai_provider.lower()
         
         if provider == "openai":
-            return ModelFactory._create_openai_model(config)
+            cache_key = (
+                provider,
+                config.openai_model,
+                config.openai_base_url,
+                config.openai_api_key,
+                config.openai_max_tokens,
+                http_async_client,
+            )
+            factory = ModelFactory._create_openai_model
         elif provider == "openai_compatible":
-            return ModelFactory._create_openai_compatible_model(config)
+            cache_key = (
+                provider,
+                config.openai_compatible_model,
+                config.openai_compatible_base_url,
+                config.openai_compatible_api_key,
+                config.openai_compatible_max_tokens,
+                http_async_client,
+            )
+            factory = ModelFactory._create_openai_compatible_model
         else:
             raise ValueError(f"Unsupported AI provider: {provider}")
 
-    
+        model = ModelFactory._model_cache.get(cache_key)
+        if model is None:
+            model = factory(config, http_async_client)
+            ModelFactory._model_cache[cache_key] = model
+        return model
+
+    @staticmethod
+    def clear_cache():
+        """Drop shared model instances (e.g. after closing their HTTP client)"""
+        ModelFactory._model_cache.clear()
 
     @staticmethod
-    def _create_openai_model(config: Config) -> ChatOpenAI:
+    def _create_openai_model(
+        config: Config, http_async_client: Optional[httpx.AsyncClient] = None
+    ) -> ChatOpenAI:
         """Create OpenAI model"""
         if not config.openai_api_key:
             raise ValueError("OPENAI_API_KEY is required for OpenAI provider")
@@ -53,10 +90,13 @@ class ModelFactory:
             api_key=config.openai_api_key,
             base_url=config.openai_base_url,
             max_tokens=config.openai_max_tokens,
+            http_async_client=http_async_client,
         )
 
     @staticmethod
-    def _create_openai_compatible_model(config: Config) -> ChatOpenAI:
+    def _create_openai_compatible_model(
+        config: Config, http_async_client: Optional[httpx.AsyncClient] = None
+    ) -> ChatOpenAI:
         """Create OpenAI-compatible model (e.g., Ollama, LocalAI)"""
         # Note: OpenAI-compatible endpoints might not require an API key
         api_key = config.openai_compatible_api_key or "not-required"
@@ -67,6 +107,7 @@ class ModelFactory:
             api_key=api_key,
             base_url=config.openai_compatible_base_url,
             max_tokens=config.openai_compatible_max_tokens,
+            http_async_client=http_async_client,
         )
 
     @staticmethod
@@ -4,11 +4,17 @@ Simplified processor that works with OpenAI Compatible endpoints
 """
 
 import asyncio
-from typing import Any, Callable, Dict, List, Optional
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+import array
+import hashlib
+import time
+from collections import OrderedDict, deque
+from functools import lru_cache
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional
+
+import httpx
+from tenacity import retry, stop_after_attempt, wait_random_exponential, retry_if_exception_type
 
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
-from langchain_core.tools import BaseTool
 from langchain_openai import ChatOpenAI
 
 from src.core.config import Config
@@ -17,20 +23,159 @@ from src.core.logger import get_logger
 logger = get_logger(__name__)
 
 
+@lru_cache(maxsize=128)
+def _render_context(
+    resource_count: Optional[int],
+    by_type: tuple,
+    variable_count: Optional[int],
+    output_count: Optional[int],
+) -> str:
+    """Render the infrastructure overview from a canonical, hashable snapshot"""
+    context_parts = ["## Current Infrastructure Overview\n"]
+
+    # Add resource information
+    if resource_count is not None:
+        context_parts.append(f"**Resources**: {resource_count} total resources defined")
+
+        # Add resource breakdown
+        if by_type:
+            context_parts.append("\n**Resource Types**:")
+            for resource_type, count in sorted(by_type, key=lambda x: x[1], reverse=True):
+                context_parts.append(f"- {resource_type}: {count}")
+
+    # Add variables
+    if variable_count is not None:
+        context_parts.append(f"\n**Variables**: {variable_count} configuration variables")
+
+    # Add outputs
+    if output_count is not None:
+        context_parts.append(f"\n**Outputs**: {output_count} output values")
+
+    return "\n".join(context_parts)
+
+
+# Indexes into OpenAIProcessor._usage
+_INPUT, _OUTPUT = 0, 1
+
+_jittered_backoff = wait_random_exponential(multiplier=0.5, max=10)
+
+
+def _estimate_tokens(messages: List) -> int:
+    """Rough prompt size in tokens (~4 characters per token)"""
+    return sum(len(message.content) for message in messages) // 4
+
+
+def _used_tokens(response: Any) -> Optional[int]:
+    """Total tokens reported in a response's usage metadata, or None if it has none"""
+    usage = getattr(response, 'usage_metadata', None)
+    if not usage:
+        return None
+    # Handle both dict and object forms
+    if isinstance(usage, dict):
+        return usage.get('input_tokens', 0) + usage.get('output_tokens', 0)
+    return getattr(usage, 'input_tokens', 0) + getattr(usage, 'output_tokens', 0)
+
+
+class _RateLimiter:
+    """Token bucket over requests and tokens per minute; a limit of 0 disables it"""
+
+    def __init__(self, max_requests_per_minute: int, max_tokens_per_minute: int):
+        self.max_requests_per_minute = max_requests_per_minute
+        self.max_tokens_per_minute = max_tokens_per_minute
+        self.request_capacity = float(max_requests_per_minute)
+        self.token_capacity = float(max_tokens_per_minute)
+        self.last_refill = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_requests_per_minute > 0 or self.max_tokens_per_minute > 0
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self.last_refill
+        self.last_refill = now
+        self.request_capacity = min(
+            float(self.max_requests_per_minute),
+            self.request_capacity + elapsed * self.max_requests_per_minute / 60,
+        )
+        self.token_capacity = min(
+            float(self.max_tokens_per_minute),
+            self.token_capacity + elapsed * self.max_tokens_per_minute / 60,
+        )
+
+    async def acquire(self, estimated_tokens: int) -> int:
+        """
+        Wait until both buckets can cover one request of the estimated size
+
+        Returns:
+            Tokens reserved from the bucket, to pass to reconcile once the
+            request's actual usage is known
+        """
+        if not self.enabled:
+            return 0
+
+        needed_requests = 1 if self.max_requests_per_minute else 0
+        # A single request larger than the whole bucket would otherwise wait forever
+        needed_tokens = min(estimated_tokens, self.max_tokens_per_minute)
+
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.request_capacity >= needed_requests and self.token_capacity >= needed_tokens:
+                    self.request_capacity -= needed_requests
+                    self.token_capacity -= needed_tokens
+                    return needed_tokens
+
+                # Sleep until the scarcer bucket has refilled enough
+                delay = 0.0
+                if self.max_requests_per_minute:
+                    delay = max(delay, (needed_requests - self.request_capacity) * 60 / self.max_requests_per_minute)
+                if self.max_tokens_per_minute:
+                    delay = max(delay, (needed_tokens - self.token_capacity) * 60 / self.max_tokens_per_minute)
+                await asyncio.sleep(delay)
+
+    def reconcile(self, reserved_tokens: int, used_tokens: Optional[int]):
+        """Settle a reservation against actual usage, refunding what went unused"""
+        if not self.max_tokens_per_minute or used_tokens is None:
+            return
+        self.token_capacity = min(
+            float(self.max_tokens_per_minute),
+            self.token_capacity + reserved_tokens - used_tokens,
+        )
+
+
 class OpenAIProcessor:
     """OpenAI Compatible processor for Terraform operations"""
 
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, http_client: Optional[httpx.AsyncClient] = None):
         self.config = config
+        self.http_client = http_client
         self.model = None
-        self.conversation_history: List[Dict[str, Any]] = []
+        self.tool_handlers: Dict[str, Callable] = {}
+        # Static system prompt kept as a stable prefix for server-side prompt caching
+        self._system_message = SystemMessage(content=self._get_system_prompt())
+        self._system_hash = hashlib.blake2b(
+            self._system_message.content.encode(), digest_size=16
+        ).hexdigest()
+        # In-memory LRU of response contents keyed by prompt (0 disables it)
+        self._response_cache: OrderedDict[str, str] = OrderedDict()
+        # Sliding window of the last `history_turns` user/assistant exchanges
+        self.conversation_history: Deque[Dict[str, Any]] = deque(
+            maxlen=2 * config.history_turns
+        )
 
         # Initialize the model
         self._initialize_model()
 
-        # Token tracking
-        self.total_input_tokens = 0
-        self.total_output_tokens = 0
+        # Token tracking: running [input, output] totals
+        self._usage = array.array('q', [0, 0])
+
+        # Proactive client-side throttling against the endpoint's RPM/TPM limits
+        self._rate_limiter = _RateLimiter(
+            config.openai_max_requests_per_minute,
+            config.openai_max_tokens_per_minute,
+        )
 
         # Streaming callback
         self.stream_callback: Optional[Callable[[str], None]] = None
@@ -54,14 +199,12 @@ class OpenAIProcessor:
             base_url=self.config.openai_compatible_base_url,
             max_tokens=self.config.openai_compatible_max_tokens,
             temperature=0.1,
+            http_async_client=self.http_client,
+            stream_usage=True,  # Final streamed chunk carries token usage
         )
 
-    def register_tool_handler(self, tool_name: str, handler: callable):
+    def register_tool_handler(self, tool_name: str, handler: Callable):
         """Register a tool handler (for compatibility with existing code)"""
-        # Store tool handlers for potential future use
-        if not hasattr(self, 'tool_handlers'):
-            self.tool_handlers = {}
-
         self.tool_handlers[tool_name] = handler
         logger.info(f"Registered tool handler: {tool_name}")
 
@@ -77,13 +220,24 @@ class OpenAIProcessor:
 
     @retry(
         stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
+        wait=_jittered_backoff,
+        # The OpenAI client already retries its connection, timeout and 429 errors
+        # (honoring Retry-After), so only errors raised outside it are retried here
         retry=retry_if_exception_type((ConnectionError, TimeoutError)),
         reraise=True
     )
     async def _invoke_model_with_retry(self, messages: List) -> Any:
         """Invoke model with retry logic for transient failures"""
-        return await self.model.ainvoke(messages)
+        reserved_tokens = await self._acquire_capacity(messages)
+        response = await self.model.ainvoke(messages)
+        self._rate_limiter.reconcile(reserved_tokens, _used_tokens(response))
+        return response
+
+    async def _acquire_capacity(self, messages: List) -> int:
+        """Wait for rate-limit capacity for one call with these messages, returning the tokens reserved"""
+        return await self._rate_limiter.acquire(
+            _estimate_tokens(messages) + self.config.openai_compatible_max_tokens
+        )
 
     async def process_request(self, request: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
@@ -97,50 +251,8 @@ class OpenAIProcessor:
             Response dictionary with messages
         """
         try:
-            # Validate input
-            if not request or not request.strip():
-                raise ValueError("Request cannot be empty")
-
-            # Build conversation messages
-            messages = self._build_messages(request, context)
-
-            # Use streaming if callback is set
-            if self.stream_callback:
-                response_content = ""
-                async for chunk in self.model.astream(messages):
-                    if hasattr(chunk, 'content') and chunk.content:
-                        response_content += chunk.content
-                        self.stream_callback(chunk.content)
-
-                # Create response object
-                response = AIMessage(content=response_content)
-            else:
-                # Get response from model with retry (non-streaming)
-                response = await self._invoke_model_with_retry(messages)
-
-            # Update token usage
-            if hasattr(response, 'usage_metadata') and response.usage_metadata:
-                usage = response.usage_metadata
-                # Handle both dict and object forms
-                if isinstance(usage, dict):
-                    self.total_input_tokens += usage.get('input_tokens', 0)
-                    self.total_output_tokens += usage.get('output_tokens', 0)
-                elif hasattr(usage, 'input_tokens'):
-                    self.total_input_tokens += getattr(usage, 'input_tokens', 0)
-                    self.total_output_tokens += getattr(usage, 'output_tokens', 0)
-
-            # Add to conversation history
-            self.conversation_history.append({"role": "user", "content": request})
-            self.conversation_history.append({"role": "assistant", "content": response.content})
-
-            return {
-                "messages": [response],
-                "usage": {
-                    "input_tokens": self.total_input_tokens,
-                    "output_tokens": self.total_output_tokens,
-                    "total_tokens": self.total_input_tokens + self.total_output_tokens
-                }
-            }
+            response = await self._respond(request, context)
+            return {"messages": [response], "usage": self._usage_totals()}
 
         except ValueError as e:
             logger.error(f"Validation error: {e}")
@@ -155,6 +267,106 @@ class OpenAIProcessor:
                 "error": str(e)
             }
 
+    async def _respond(self, request: str, context: Optional[Dict[str, Any]] = None) -> AIMessage:
+        """Answer a request and do the usage, cache and history bookkeeping"""
+        # Validate input
+        if not request or not request.strip():
+            raise ValueError("Request cannot be empty")
+
+        # Build conversation messages
+        messages = self._build_messages(request, context)
+
+        # Repeated questions against the same project snapshot skip the model call
+        cache_key = self._response_cache_key(messages)
+        cached_content = self._get_cached_response(cache_key)
+
+        if cached_content is not None:
+            response = AIMessage(content=cached_content)
+            if self.stream_callback:
+                self.stream_callback(cached_content)
+        # Use streaming if callback is set
+        elif self.stream_callback:
+            response = None
+            async for chunk in self._stream_chunks(messages):
+                # Chunks add up to the full message, usage metadata included
+                response = chunk if response is None else response + chunk
+                if chunk.content:
+                    self.stream_callback(chunk.content)
+
+            if response is None:
+                response = AIMessage(content="")
+        else:
+            # Get response from model with retry (non-streaming)
+            response = await self._invoke_model_with_retry(messages)
+
+        # Update token usage
+        self._record_usage(response)
+        if cached_content is None:
+            self._cache_response(cache_key, response.content)
+
+        # Add to conversation history
+        self.conversation_history.append({"role": "user", "content": request})
+        self.conversation_history.append({"role": "assistant", "content": response.content})
+
+        return response
+
+    async def _stream_chunks(self, messages: List) -> AsyncIterator[Any]:
+        """Stream raw message chunks from the model"""
+        reserved_tokens = await self._acquire_capacity(messages)
+        used_tokens = None
+        try:
+            async for chunk in self.model.astream(messages):
+                # Usage normally arrives on the final chunk
+                chunk_tokens = _used_tokens(chunk)
+                if chunk_tokens is not None:
+                    used_tokens = (used_tokens or 0) + chunk_tokens
+                yield chunk
+        finally:
+            self._rate_limiter.reconcile(reserved_tokens, used_tokens)
+
+    def _response_cache_key(self, messages: List) -> str:
+        """Hash the model, system prompt and user turn (request plus rendered context)"""
+        key = f"{self.config.openai_compatible_model}|{self._system_hash}|{messages[-1].content}"
+        return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+    def _get_cached_response(self, cache_key: str) -> Optional[str]:
+        """Return a cached response content, marking it most recently used"""
+        content = self._response_cache.get(cache_key)
+        if content is not None:
+            self._response_cache.move_to_end(cache_key)
+            logger.debug("Response cache hit")
+        return content
+
+    def _cache_response(self, cache_key: str, content: str):
+        """Store a successful response, evicting the least recently used entry"""
+        if self.config.response_cache_size <= 0 or not content:
+            return
+        self._response_cache[cache_key] = content
+        self._response_cache.move_to_end(cache_key)
+        if len(self._response_cache) > self.config.response_cache_size:
+            self._response_cache.popitem(last=False)
+
+    def _record_usage(self, response: Any):
+        """Add a response's token usage to the running totals"""
+        if hasattr(response, 'usage_metadata') and response.usage_metadata:
+            usage = response.usage_metadata
+            # Handle both dict and object forms
+            if isinstance(usage, dict):
+                self._usage[_INPUT] += usage.get('input_tokens', 0)
+                self._usage[_OUTPUT] += usage.get('output_tokens', 0)
+            elif hasattr(usage, 'input_tokens'):
+                self._usage[_INPUT] += getattr(usage, 'input_tokens', 0)
+                self._usage[_OUTPUT] += getattr(usage, 'output_tokens', 0)
+
+    def _usage_totals(self) -> Dict[str, int]:
+        """Running token usage in the shape returned with each response"""
+        input_tokens, output_tokens = self._usage
+        return {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens
+        }
+
     async def process_query(self, query: str, project_data: Optional[Dict[str, Any]] = None) -> str:
         """
         Process a query (for compatibility with existing code)
@@ -167,42 +379,24 @@ class OpenAIProcessor:
             Processed response as string
         """
         try:
-            result = await self.process_request(query, project_data)
-            
-            # Extract the response content from the result
-            if isinstance(result, dict) and "messages" in result:
-                messages = result["messages"]
-                if messages and len(messages) > 0:
-                    last_message = messages[-1]
-                    if hasattr(last_message, 'content'):
-                        return last_message.content
-                    elif isinstance(last_message, dict) and "content" in last_message:
-                        return last_message["content"]
-            
-            # Fallback: return string representation
-            return str(result)
-            
+            response = await self._respond(query, project_data)
+            return response.content
+
+        except ValueError as e:
+            logger.error(f"Validation error: {e}")
+            return f"Validation Error: {str(e)}"
         except Exception as e:
-            logger.error(f"Error processing query: {e}")
-            return f"Error processing query: {str(e)}"
+            logger.error(f"Error processing query: {e}", exc_info=True)
+            return f"Error: {str(e)}"
 
     def _build_messages(self, request: str, context: Optional[Dict[str, Any]] = None) -> List:
         """Build message list for the model"""
-        messages = []
-        
-        # System prompt
-        system_prompt = self._get_system_prompt()
-        messages.append(SystemMessage(content=system_prompt))
-        
-        # Add context if provided
-        if context:
-            context_prompt = self._build_context_prompt(context)
-            messages.append(SystemMessage(content=context_prompt))
-        
-        # User request
-        messages.append(HumanMessage(content=request))
-        
-        return messages
+        # Volatile project data goes in the user turn so the system prefix never changes
+        context_prompt = self._build_context_prompt(context) if context else ""
+        if context_prompt:
+            request = f"<infra_overview>\n{context_prompt}\n</infra_overview>\n\nUser request: {request}"
+
+        return [self._system_message, HumanMessage(content=request)]
 
     def _get_system_prompt(self) -> str:
         """Get the system prompt for the model"""
@@ -230,44 +424,39 @@ You have access to analyze .tf files and provide infrastructure insights.
         """Build context prompt from project data"""
         if not project_data:
             return ""
-        
-        context_parts = ["## Current Infrastructure Overview\n"]
-        
-        # Add resource information
+
         resources = project_data.get("resources", {})
-        if resources:
-            context_parts.append(f"**Resources**: {resources.get('count', 0)} total resources defined")
-            
-            # Add resource breakdown
-            by_type = resources.get("by_type", {})
-            if by_type:
-                context_parts.append("\n**Resource Types**:")
-                for resource_type, count in sorted(by_type.items(), key=lambda x: x[1], reverse=True):
-                    context_parts.append(f"- {resource_type}: {count}")
-        
-        # Add variables
         variables = project_data.get("variables", {})
-        if variables:
-            context_parts.append(f"\n**Variables**: {variables.get('count', 0)} configuration variables")
-        
-        # Add outputs
         outputs = project_data.get("outputs", {})
-        if outputs:
-            context_parts.append(f"\n**Outputs**: {outputs.get('count', 0)} output values")
-        
-        return "\n".join(context_parts)
+
+        return _render_context(
+            resources.get("count", 0) if resources else None,
+            tuple(sorted(resources.get("by_type", {}).items())) if resources else (),
+            variables.get("count", 0) if variables else None,
+            outputs.get("count", 0) if outputs else None,
+        )
 
     def clear_memory(self):
         """Clear processor memory"""
         self.conversation_history.clear()
+        self._response_cache.clear()
         logger.info("Processor memory cleared")
 
+    @property
+    def total_input_tokens(self) -> int:
+        return self._usage[_INPUT]
+
+    @property
+    def total_output_tokens(self) -> int:
+        return self._usage[_OUTPUT]
+
     def get_token_usage_stats(self) -> Dict[str, Any]:
         """Get token usage statistics"""
+        input_tokens, output_tokens = self._usage
         return {
-            "total_input_tokens": self.total_input_tokens,
-            "total_output_tokens": self.total_output_tokens,
-            "total_tokens": self.total_input_tokens + self.total_output_tokens,
+            "total_input_tokens": input_tokens,
+            "total_output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
         }
 
     async def test_connection(self) -> Dict[str, Any]:
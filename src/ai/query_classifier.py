@@ -9,6 +9,121 @@ from src.core.logger import get_logger
 logger = get_logger(__name__)
 
 
+def _compile_keywords(keywords) -> re.Pattern:
+    """Compile literal keywords into a single alternation scanned in one pass"""
+    return re.compile("|".join(re.escape(keyword) for keyword in keywords))
+
+
+def _compile_patterns(patterns) -> re.Pattern:
+    """Join regex patterns into one precompiled, case-insensitive alternation"""
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns), re.IGNORECASE)
+
+
+# DeepAgents triggers - require multi-agent coordination
+_DEEPAGENTS_KEYWORDS = frozenset({
+    # Migration-related
+    'migrate', 'migration', 'move to', 'transition', 'switch from',
+
+    # Multi-domain analysis
+    'comprehensive audit', 'full audit', 'complete analysis',
+    'compliance audit', 'soc2', 'hipaa', 'gdpr', 'pci-dss',
+
+    # Planning & strategy
+    'roadmap', 'strategy', 'plan for', 'design a', 'architect',
+    'implementation plan', 'rollout plan', 'phased approach',
+
+    # Cost optimization with constraints
+    'optimize cost', 'reduce cost', 'cost optimization',
+    'cost savings', 'roi analysis', 'cost-benefit',
+
+    # Multi-step workflows
+    'step-by-step', 'phased', 'staged rollout',
+    'blue-green', 'canary deployment',
+
+    # Risk & trade-off analysis
+    'trade-off', 'risk assessment', 'impact analysis',
+    'pros and cons', 'comparison between',
+})
+
+# Simple query patterns - use standard processor
+_SIMPLE_PATTERNS = (
+    r'^(what|show|list|get|find|display)\s+',
+    r'^how many\s+',
+    r'^does\s+',
+    r'^is\s+',
+    r'^are\s+',
+    r'^can\s+i\s+',
+    r'^tell me\s+about\s+\w+$',  # Single topic only
+)
+
+# Direct command patterns
+_COMMAND_PATTERNS = (
+    r'terraform\s+(plan|apply|destroy|init|validate|show|output|state)',
+    r'run\s+terraform',
+    r'execute\s+',
+)
+
+# Multi-domain indicators
+_MULTI_DOMAIN_PATTERNS = (
+    r'(security|cost|compliance|performance)\s+(and|&|\+)\s+(security|cost|compliance|performance)',
+    r'(analyze|review|audit)\s+.{20,}',  # Long analysis requests
+    r'including\s+.*\s+and\s+',
+    r'considering\s+.*\s+and\s+',
+)
+
+# Domain keyword tables, compiled once at import time
+_DOMAIN_KEYWORDS = {
+    'security': ['security', 'secure', 'vulnerability', 'compliance', 'audit', 'cis', 'soc2', 'hipaa'],
+    'cost': ['cost', 'price', 'pricing', 'expensive', 'optimize', 'savings', 'budget'],
+    'performance': ['performance', 'latency', 'throughput', 'speed', 'optimization'],
+    'deployment': ['deploy', 'deployment', 'rollout', 'release', 'provision'],
+    'migration': ['migrate', 'migration', 'move', 'transition', 'transfer'],
+    'compliance': ['compliance', 'compliant', 'regulation', 'gdpr', 'hipaa', 'pci'],
+}
+_DOMAIN_PATTERNS = {
+    domain: _compile_keywords(keywords) for domain, keywords in _DOMAIN_KEYWORDS.items()
+}
+
+_SIMPLE_PATTERN = _compile_patterns(_SIMPLE_PATTERNS)
+_COMMAND_PATTERN = _compile_patterns(_COMMAND_PATTERNS)
+
+# Zero-width lookahead so overlapping triggers ("staged rollout plan") are all
+# seen; longest keywords first so the longest trigger wins at each position
+_DEEPAGENTS_PATTERN = re.compile(
+    "(?=(" + "|".join(
+        re.escape(keyword)
+        for keyword in sorted(_DEEPAGENTS_KEYWORDS, key=len, reverse=True)
+    ) + "))"
+)
+# Shorter triggers hidden behind a longer one starting at the same position
+_DEEPAGENTS_PREFIXES = {
+    keyword: tuple(
+        other for other in _DEEPAGENTS_KEYWORDS
+        if other != keyword and keyword.startswith(other)
+    )
+    for keyword in _DEEPAGENTS_KEYWORDS
+}
+
+_MULTI_STEP_PATTERN = _compile_keywords([
+    'step', 'phase', 'stage', 'first', 'then', 'next', 'after',
+    'plan', 'roadmap', 'strategy', 'approach',
+])
+
+# Scoring weights and thresholds, in tenths of confidence
+_TRIGGER_POINTS = 3
+_MULTI_DOMAIN_POINTS = 3
+_LONG_QUERY_POINTS = 2
+_MULTI_STEP_POINTS = 3
+_COMPLEX_POINTS = 6
+_MODERATE_POINTS = 3
+_MAX_TRIGGER_REASONS = 3
+
+# A query longer than _LONG_QUERY_WORDS words has at least this many characters
+# (one per word plus a separator between each), so shorter ones skip the split
+_LONG_QUERY_WORDS = 30
+_LONG_QUERY_MIN_CHARS = 2 * _LONG_QUERY_WORDS + 1
+
+
 class QueryComplexity:
     """Query complexity levels"""
     SIMPLE = "simple"           # Simple queries, direct answers
@@ -20,57 +135,10 @@ class QueryClassifier:
     """Intelligently classify queries to determine processing strategy"""
 
     def __init__(self):
-        # DeepAgents triggers - require multi-agent coordination
-        self.deepagents_keywords = {
-            # Migration-related
-            'migrate', 'migration', 'move to', 'transition', 'switch from',
-
-            # Multi-domain analysis
-            'comprehensive audit', 'full audit', 'complete analysis',
-            'compliance audit', 'soc2', 'hipaa', 'gdpr', 'pci-dss',
-
-            # Planning & strategy
-            'roadmap', 'strategy', 'plan for', 'design a', 'architect',
-            'implementation plan', 'rollout plan', 'phased approach',
-
-            # Cost optimization with constraints
-            'optimize cost', 'reduce cost', 'cost optimization',
-            'cost savings', 'roi analysis', 'cost-benefit',
-
-            # Multi-step workflows
-            'step-by-step', 'phased', 'staged rollout',
-            'blue-green', 'canary deployment',
-
-            # Risk & trade-off analysis
-            'trade-off', 'risk assessment', 'impact analysis',
-            'pros and cons', 'comparison between',
-        }
-
-        # Simple query patterns - use standard processor
-        self.simple_patterns = [
-            r'^(what|show|list|get|find|display)\s+',
-            r'^how many\s+',
-            r'^does\s+',
-            r'^is\s+',
-            r'^are\s+',
-            r'^can\s+i\s+',
-            r'^tell me\s+about\s+\w+$',  # Single topic only
-        ]
-
-        # Direct command patterns
-        self.command_patterns = [
-            r'terraform\s+(plan|apply|destroy|init|validate|show|output|state)',
-            r'run\s+terraform',
-            r'execute\s+',
-        ]
-
-        # Multi-domain indicators
-        self.multi_domain_patterns = [
-            r'(security|cost|compliance|performance)\s+(and|&|\+)\s+(security|cost|compliance|performance)',
-            r'(analyze|review|audit)\s+.{20,}',  # Long analysis requests
-            r'including\s+.*\s+and\s+',
-            r'considering\s+.*\s+and\s+',
-        ]
+        self.deepagents_keywords = _DEEPAGENTS_KEYWORDS
+        self.simple_patterns = _SIMPLE_PATTERNS
+        self.command_patterns = _COMMAND_PATTERNS
+        self.multi_domain_patterns = _MULTI_DOMAIN_PATTERNS
 
     def classify_query(self, query: str) -> Tuple[str, Dict[str, any]]:
         """
@@ -82,7 +150,7 @@ class QueryClassifier:
         Returns:
             Tuple of (complexity_level, metadata)
         """
-        query_lower = query.lower().strip()
+        query = query.strip()
 
         metadata = {
             'requires_deepagents': False,
@@ -92,117 +160,95 @@ class QueryClassifier:
         }
 
         # 1. Check for direct Terraform commands - always SIMPLE
-        if self._is_terraform_command(query_lower):
+        if self._is_terraform_command(query):
             metadata['reasoning'].append("Direct Terraform command detected")
             metadata['confidence'] = 1.0
             return QueryComplexity.SIMPLE, metadata
 
         # 2. Check for simple query patterns
-        if self._is_simple_pattern(query_lower):
+        if self._is_simple_pattern(query):
             metadata['reasoning'].append("Simple query pattern detected")
             metadata['confidence'] = 0.9
             return QueryComplexity.SIMPLE, metadata
 
+        # Keyword scans below run on a lowercased copy
+        query_lower = query.lower()
+
+        # Scores are kept in integer tenths; confidence is points / 10
         # 3. Check for DeepAgents triggers
-        deepagents_score, triggers = self._check_deepagents_triggers(query_lower)
-        if triggers:
-            metadata['reasoning'].extend(triggers)
+        triggers = self._check_deepagents_triggers(query_lower)
+        points = _TRIGGER_POINTS * len(triggers)
+        metadata['reasoning'].extend(
+            f"Trigger keyword: '{keyword}'" for keyword in triggers[:_MAX_TRIGGER_REASONS]
+        )
 
         # 4. Check for multi-domain requirements
         domains = self._identify_domains(query_lower)
         metadata['domains'] = domains
 
         if len(domains) > 1:
-            deepagents_score += 0.3
+            points += _MULTI_DOMAIN_POINTS
             metadata['reasoning'].append(f"Multiple domains detected: {', '.join(domains)}")
 
-        # 5. Check query length and complexity indicators
-        word_count = len(query_lower.split())
-        if word_count > 30:
-            deepagents_score += 0.2
-            metadata['reasoning'].append(f"Long query ({word_count} words) suggests complexity")
+        # 5. Check query length and complexity indicators; short queries can't
+        # exceed the word limit, so they skip the split
+        if len(query_lower) >= _LONG_QUERY_MIN_CHARS:
+            word_count = len(query_lower.split())
+            if word_count > _LONG_QUERY_WORDS:
+                points += _LONG_QUERY_POINTS
+                metadata['reasoning'].append(f"Long query ({word_count} words) suggests complexity")
 
         # 6. Check for multi-step indicators
         if self._has_multi_step_indicators(query_lower):
-            deepagents_score += 0.3
+            points += _MULTI_STEP_POINTS
             metadata['reasoning'].append("Multi-step workflow indicators detected")
 
         # 7. Make final decision
-        metadata['confidence'] = min(deepagents_score, 1.0)
+        metadata['confidence'] = min(points / 10, 1.0)
 
-        if deepagents_score >= 0.6:  # Lowered threshold for complex queries
+        if points >= _COMPLEX_POINTS:  # Lowered threshold for complex queries
             metadata['requires_deepagents'] = True
             return QueryComplexity.COMPLEX, metadata
-        elif deepagents_score >= 0.3:
+        elif points >= _MODERATE_POINTS:
             return QueryComplexity.MODERATE, metadata
         else:
             return QueryComplexity.SIMPLE, metadata
 
     def _is_terraform_command(self, query: str) -> bool:
         """Check if query is a direct Terraform command"""
-        for pattern in self.command_patterns:
-            if re.search(pattern, query):
-                return True
-        return False
+        return _COMMAND_PATTERN.search(query) is not None
 
     def _is_simple_pattern(self, query: str) -> bool:
         """Check if query matches simple pattern"""
-        for pattern in self.simple_patterns:
-            if re.match(pattern, query):
-                # Additional check: if it's very short and specific, it's simple
-                if len(query.split()) <= 10:
-                    return True
-        return False
-
-    def _check_deepagents_triggers(self, query: str) -> Tuple[float, List[str]]:
+        # Additional check: if it's very short and specific, it's simple
+        return _SIMPLE_PATTERN.match(query) is not None and len(query.split()) <= 10
+
+    def _check_deepagents_triggers(self, query: str) -> List[str]:
         """
         Check for DeepAgents trigger keywords
 
         Returns:
-            Tuple of (score, list of reasons)
+            Distinct trigger keywords found, in order of appearance
         """
-        score = 0.0
-        reasons = []
-
-        for keyword in self.deepagents_keywords:
-            if keyword in query:
-                score += 0.3
-                reasons.append(f"Trigger keyword: '{keyword}'")
-
-                # Don't over-count
-                if score >= 0.9:
-                    break
-
-        return score, reasons
+        matched = {}
+        for match in _DEEPAGENTS_PATTERN.finditer(query):
+            keyword = match.group(1)
+            matched[keyword] = None
+            matched.update(dict.fromkeys(_DEEPAGENTS_PREFIXES[keyword]))
+        return list(matched)
 
     def _identify_domains(self, query: str) -> List[str]:
         """Identify which domains are mentioned in the query"""
-        domains = []
-        domain_keywords = {
-            'security': ['security', 'secure', 'vulnerability', 'compliance', 'audit', 'cis', 'soc2', 'hipaa'],
-            'cost': ['cost', 'price', 'pricing', 'expensive', 'optimize', 'savings', 'budget'],
-            'performance': ['performance', 'latency', 'throughput', 'speed', 'optimization'],
-            'deployment': ['deploy', 'deployment', 'rollout', 'release', 'provision'],
-            'migration': ['migrate', 'migration', 'move', 'transition', 'transfer'],
-            'compliance': ['compliance', 'compliant', 'regulation', 'gdpr', 'hipaa', 'pci'],
-        }
-
-        for domain, keywords in domain_keywords.items():
-            if any(keyword in query for keyword in keywords):
-                if domain not in domains:
-                    domains.append(domain)
-
-        return domains
+        return [
+            domain
+            for domain, pattern in _DOMAIN_PATTERNS.items()
+            if pattern.search(query)
+        ]
 
     def _has_multi_step_indicators(self, query: str) -> bool:
         """Check if query indicates multi-step workflow"""
-        multi_step_indicators = [
-            'step', 'phase', 'stage', 'first', 'then', 'next', 'after',
-            'plan', 'roadmap', 'strategy', 'approach',
-        ]
-
-        count = sum(1 for indicator in multi_step_indicators if indicator in query)
-        return count >= 2
+        found = {match.group(0) for match in _MULTI_STEP_PATTERN.finditer(query)}
+        return len(found) >= 2
 
     def should_use_deepagents(
         self,
@@ -247,6 +293,10 @@ class QueryClassifier:
             return False, reasoning
 
 
+# Shared instance for the convenience function; the classifier is stateless
+_DEFAULT_CLASSIFIER = QueryClassifier()
+
+
 # Convenience function
 def should_use_deepagents(query: str, deepagents_available: bool = True) -> Tuple[bool, str]:
     """
@@ -259,5 +309,4 @@ def should_use_deepagents(query: str, deepagents_available: bool = True) -> Tupl
     Returns:
         Tuple of (use_deepagents, reasoning)
     """
-    classifier = QueryClassifier()
-    return classifier.should_use_deepagents(query, deepagents_available)
+    return _DEFAULT_CLASSIFIER.should_use_deepagents(query, deepagents_available)
@@ -3,30 +3,169 @@ Core Terraform AI Agent business logic
 """
 
 import asyncio
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+import os
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
 
 from src.ai.enhanced_processor import EnhancedAIProcessor
+from src.ai.model_factory import ModelFactory
 from src.core.config import Config
 from src.core.human_in_the_loop import HumanInTheLoop, ToolInterceptor
 from src.core.logger import get_logger
+from src.core.response_cache import ResponseCache
 from src.core.task_engine import Task, TaskEngine, TaskStatus
 from src.core.workflows import WorkflowTemplates, WorkflowType
 
 logger = get_logger(__name__)
 
+# Commands answered without the LLM
+_EXIT_COMMANDS = frozenset({"exit", "quit", "q"})
+_SIMPLE_SYSTEM_COMMANDS = {
+    "help": "help",
+    "h": "help",
+    "status": "status",
+    "clear": "clear",
+    "cls": "clear",
+    "tokens": "tokens",
+    "usage": "tokens",
+}
+_PASSTHROUGH_PREFIXES = ("export", "import")
+
+# Terraform command phrases in priority order: when several appear in one
+# command, the phrase listed first decides the action
+_TERRAFORM_COMMANDS = (
+    ("terraform init", "init"),
+    ("terraform plan", "plan"),
+    ("terraform apply", "apply"),
+    ("terraform destroy", "destroy"),
+    ("terraform validate", "validate"),
+    ("terraform show", "show"),
+    ("terraform output", "output"),
+    ("terraform state list", "state_list"),
+    ("run terraform plan", "plan"),
+    ("run terraform apply", "apply"),
+    ("run terraform destroy", "destroy"),
+    ("run terraform init", "init"),
+    ("validate configuration", "validate"),
+    ("validate terraform", "validate"),
+    ("show terraform plan", "show"),
+    ("show terraform state", "state_list"),
+    ("list terraform state", "state_list"),
+    ("terraform state", "state_list"),
+)
+_TERRAFORM_COMMAND_PRIORITY = {
+    pattern: index for index, (pattern, _) in enumerate(_TERRAFORM_COMMANDS)
+}
+# Zero-width lookahead so overlapping phrases are all seen; at a given
+# position the alternation tries phrases in priority order
+_TERRAFORM_COMMAND_RE = re.compile(
+    "(?=(" + "|".join(re.escape(pattern) for pattern, _ in _TERRAFORM_COMMANDS) + "))"
+)
+
+# Display titles for terraform actions, e.g. "state_list" -> "State List"
+_ACTION_TITLES = {
+    action: action.replace("_", " ").title()
+    for action in {action for _, action in _TERRAFORM_COMMANDS}
+}
+
+# Result headers, formatted once per action
+_SUCCESS_HEADERS = {
+    action: f"✅ **Terraform {title} Successful**\n\n" for action, title in _ACTION_TITLES.items()
+}
+_FAILURE_HEADERS = {
+    action: f"❌ **Terraform {title} Failed**\n\n" for action, title in _ACTION_TITLES.items()
+}
+
+# Terraform actions that may change the project and invalidate its snapshot
+_WRITE_ACTIONS = frozenset({"init", "apply", "destroy"})
+
+# Terraform actions that only read state; their results are reused while the state is unchanged
+_STATE_READ_ACTIONS = frozenset({"show", "output", "state_list"})
+_STATE_READ_CACHE_TTL_SECONDS = 30.0
+
+# Project data sections returned as-is by the analyze_infrastructure tool
+_ANALYSIS_SECTIONS = frozenset({"resources", "variables", "outputs", "providers"})
+
+# Line scanners for terraform output, run by the regex engine instead of a Python loop
+_APPLIED_LINE_RE = re.compile(r"^(?=.*:)(?=.*(?:created|modified)).*$", re.MULTILINE)
+_OUTPUT_VALUE_RE = re.compile(r"^(?![^\S\n]*#)([^=\n]*)=(.*)$", re.MULTILINE)
+_NON_EMPTY_LINE_RE = re.compile(r"^[^\S\n]*(\S(?:.*\S)?)", re.MULTILINE)
+_ERROR_LINE_RE = re.compile(r"^.*(?:error:|failed|invalid|missing).*$", re.IGNORECASE | re.MULTILINE)
+
+# Lines of failing output shown under "Details"
+_MAX_ERROR_LINES = 3
+
+# Static formatter text, built once
+_PLAN_NO_CHANGES = (
+    "**📋 Plan Summary:**\n"
+    "• ➕ Resources to add: 0\n"
+    "• 🔄 Resources to change: 0\n"
+    "• 🗑️  Resources to destroy: 0\n\n"
+    "🎉 **Good news!** Your infrastructure is already up-to-date. No changes are needed.\n\n"
+)
+_VALIDATE_SUMMARY = (
+    "**✅ Validation Summary:**\n"
+    "🔍 **Status:** Configuration syntax is valid.\n"
+    "📋 **Result:** No configuration errors found.\n\n"
+    "💡 **Good to go:** Your terraform files are ready for deployment.\n\n"
+)
+_INIT_READY = "\n🚀 **Ready:** You can now run terraform plan and apply commands.\n\n"
+
 
 class TerraformAgent:
     """Core Terraform AI Agent following single responsibility principle"""
 
+    __slots__ = (
+        "config",
+        "task_engine",
+        "_ai_processor",
+        "_stream_callback",
+        "hil",
+        "tool_interceptor",
+        "workflow_templates",
+        "running",
+        "_history_roles",
+        "_history_contents",
+        "session_start",
+        "_session_start_mono",
+        "last_command",
+        "last_result",
+        "last_plan_summary",
+        "_project_data",
+        "_project_data_dirty",
+        "_resource_index",
+        "_response_cache",
+        "_background_loop",
+        "_background_thread",
+        "_background_lock",
+        "_state_read_cache",
+    )
+
+    # AI tool name -> handler method registered with the AI processor
+    _TOOL_HANDLERS = (
+        ("execute_terraform_plan", "_handle_terraform_plan_tool"),
+        ("execute_terraform_apply", "_handle_terraform_apply_tool"),
+        ("execute_terraform_validate", "_handle_terraform_validate_tool"),
+        ("execute_terraform_init", "_handle_terraform_init_tool"),
+        ("execute_terraform_destroy", "_handle_terraform_destroy_tool"),
+        ("get_resources", "_handle_get_resources_tool"),
+        ("analyze_infrastructure", "_handle_analyze_infrastructure_tool"),
+        ("get_terraform_state", "_handle_get_state_tool"),
+    )
+
     def __init__(self, config: Config):
         self.config = config
         self.task_engine = TaskEngine(config)
 
-        # Initialize Enhanced AI processor (supports OpenAI-compatible models and DeepAgents)
-        logger.info("Initializing Enhanced AI processor")
-        self.ai_processor = EnhancedAIProcessor(config)
-        self._setup_ai_tools()
+        # Enhanced AI processor (OpenAI-compatible models and DeepAgents) is created
+        # on first use, so system and terraform-only commands never pay for it
+        self._ai_processor: Optional[EnhancedAIProcessor] = None
+        self._stream_callback: Optional[Callable[[str], None]] = None
 
         # Initialize Human-in-the-Loop system
         self.hil = HumanInTheLoop(config)
@@ -36,44 +175,70 @@ class TerraformAgent:
         self.workflow_templates = WorkflowTemplates(config)
 
         self.running = True
-        self.conversation_history = []
+        # Session history as parallel role/content columns; oldest messages are
+        # dropped once it reaches max_history
+        self._history_roles: Deque[str] = deque(maxlen=config.max_history)
+        self._history_contents: Deque[str] = deque(maxlen=config.max_history)
         self.session_start = datetime.now()
+        self._session_start_mono = time.monotonic()
 
         # Context tracking for intelligent follow-ups
         self.last_command = None
         self.last_result = None
         self.last_plan_summary = None
 
+        # Project data snapshot reused within a command turn
+        self._project_data: Optional[Dict[str, Any]] = None
+        self._project_data_dirty = True
+
+        # Lowercased lookup columns for the snapshot's resource details
+        self._resource_index: Optional[Tuple[List[Dict[str, Any]], Dict[str, List[int]], List[str]]] = None
+
+        # Optional disk cache of LLM answers, shared across sessions
+        self._response_cache: Optional[ResponseCache] = None
+        if config.response_cache_dir:
+            self._response_cache = ResponseCache(
+                config.response_cache_dir, ttl=config.response_cache_ttl
+            )
+
+        # action -> (state fingerprint, monotonic time, response, raw result)
+        self._state_read_cache: Dict[str, Tuple[Tuple[Optional[int], ...], float, str, Dict[str, Any]]] = {}
+
+        # Event loop thread for coroutines started from synchronous tool calls;
+        # tools may run on several threads at once, so creation is locked
+        self._background_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._background_thread: Optional[threading.Thread] = None
+        self._background_lock = threading.Lock()
+
         # Setup task engine callbacks
         self.task_engine.add_task_callback(self._on_task_update)
 
+    @property
+    def ai_processor(self) -> EnhancedAIProcessor:
+        """AI processor, created with its tool handlers on first access"""
+        if self._ai_processor is None:
+            logger.info("Initializing Enhanced AI processor")
+            self._ai_processor = EnhancedAIProcessor(self.config)
+            if self._stream_callback is not None:
+                self._ai_processor.set_stream_callback(self._stream_callback)
+            self._setup_ai_tools()
+        return self._ai_processor
+
+    def set_stream_callback(self, callback: Callable[[str], None]):
+        """Set the streaming callback, applied whenever the AI processor exists"""
+        self._stream_callback = callback
+        if self._ai_processor is not None:
+            self._ai_processor.set_stream_callback(callback)
+
+    async def aclose(self):
+        """Close the AI processor's connections if it was ever created"""
+        if self._ai_processor is not None:
+            await self._ai_processor.aclose()
+
     def _setup_ai_tools(self):
         """Setup tool handlers for AI processor"""
-        # Register all tool handlers
-        self.ai_processor.register_tool_handler(
-            "execute_terraform_plan", self._handle_terraform_plan_tool
-        )
-        self.ai_processor.register_tool_handler(
-            "execute_terraform_apply", self._handle_terraform_apply_tool
-        )
-        self.ai_processor.register_tool_handler(
-            "execute_terraform_validate", self._handle_terraform_validate_tool
-        )
-        self.ai_processor.register_tool_handler(
-            "execute_terraform_init", self._handle_terraform_init_tool
-        )
-        self.ai_processor.register_tool_handler(
-            "execute_terraform_destroy", self._handle_terraform_destroy_tool
-        )
-        self.ai_processor.register_tool_handler(
-            "get_resources", self._handle_get_resources_tool
-        )
-        self.ai_processor.register_tool_handler(
-            "analyze_infrastructure", self._handle_analyze_infrastructure_tool
-        )
-        self.ai_processor.register_tool_handler(
-            "get_terraform_state", self._handle_get_state_tool
-        )
+        for tool_name, handler_name in self._TOOL_HANDLERS:
+            self.ai_processor.register_tool_handler(tool_name, getattr(self, handler_name))
 
         # Initialize DeepAgents with terraform tools if enabled
         terraform_tools = self._get_terraform_tools()
@@ -81,6 +246,33 @@ class TerraformAgent:
 
         logger.info("AI tool handlers registered successfully")
 
+    def _run_coroutine_sync(self, coro) -> Any:
+        """Run a coroutine to completion from synchronous code on the background event loop"""
+        with self._background_lock:
+            if self._background_loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever, name="agent-background-loop", daemon=True
+                )
+                thread.start()
+                self._background_loop = loop
+                self._background_thread = thread
+            loop = self._background_loop
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    def _stop_background_loop(self):
+        """Stop the background event loop, wait for its thread and close it"""
+        with self._background_lock:
+            loop, thread = self._background_loop, self._background_thread
+            self._background_loop = None
+            self._background_thread = None
+        if loop is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None:
+            thread.join()
+        loop.close()
+
     def _get_terraform_tools(self) -> List[Any]:
         """Get terraform tools for DeepAgents initialization"""
         from langchain_core.tools import tool
@@ -91,19 +283,19 @@ class TerraformAgent:
         def terraform_plan(detailed: bool = True) -> str:
             """Execute terraform plan command to show what changes Terraform will make to infrastructure."""
             # Delegate to the existing task engine
-            result = asyncio.run(self.task_engine.execute_terraform_plan(detailed=detailed))
+            result = self._run_coroutine_sync(self.task_engine.execute_terraform_plan(detailed=detailed))
             return result.get("output", "Plan executed")
         
         @tool
         def terraform_validate() -> str:
             """Execute terraform validate to check if the configuration is valid."""
-            result = asyncio.run(self.task_engine.execute_terraform_validate())
+            result = self._run_coroutine_sync(self.task_engine.execute_terraform_validate())
             return result.get("output", "Validation completed")
         
         @tool
         def terraform_init(upgrade: bool = False) -> str:
             """Execute terraform init to initialize the working directory."""
-            result = asyncio.run(self.task_engine.execute_terraform_init(upgrade=upgrade))
+            result = self._run_coroutine_sync(self.task_engine.execute_terraform_init(upgrade=upgrade))
             return result.get("output", "Initialization completed")
         
         @tool
@@ -136,13 +328,13 @@ class TerraformAgent:
             @tool
             def terraform_apply(auto_approve: bool = False) -> str:
                 """Execute terraform apply to apply infrastructure changes. Requires human approval."""
-                result = asyncio.run(self.task_engine.execute_terraform_apply(auto_approve=auto_approve))
+                result = self._run_coroutine_sync(self.task_engine.execute_terraform_apply(auto_approve=auto_approve))
                 return result.get("output", "Apply completed")
             
             @tool
             def terraform_destroy(auto_approve: bool = False) -> str:
                 """Execute terraform destroy to destroy all resources. Requires human approval."""
-                result = asyncio.run(self.task_engine.execute_terraform_destroy(auto_approve=auto_approve))
+                result = self._run_coroutine_sync(self.task_engine.execute_terraform_destroy(auto_approve=auto_approve))
                 return result.get("output", "Destroy completed")
             
             terraform_tools.extend([terraform_apply, terraform_destroy])
@@ -205,25 +397,43 @@ class TerraformAgent:
         # Filter resources if criteria provided
         if resource_type or search_query:
             details = resources.get("details", [])
-            filtered = []
-
-            for resource in details:
-                if (
-                    resource_type
-                    and resource_type.lower() not in resource.get("type", "").lower()
-                ):
-                    continue
-                if (
-                    search_query
-                    and search_query.lower() not in resource.get("name", "").lower()
-                ):
-                    continue
-                filtered.append(resource)
+            type_buckets, names_lower = self._get_resource_index(details)
+
+            # Match against the distinct types, not every resource
+            if resource_type:
+                type_lower = resource_type.lower()
+                positions = sorted(
+                    position
+                    for rtype, bucket in type_buckets.items()
+                    if type_lower in rtype
+                    for position in bucket
+                )
+            else:
+                positions = range(len(details))
+
+            if search_query:
+                query_lower = search_query.lower()
+                positions = [p for p in positions if query_lower in names_lower[p]]
 
+            filtered = [details[p] for p in positions]
             return {"count": len(filtered), "resources": filtered}
 
         return resources
 
+    def _get_resource_index(
+        self, details: List[Dict[str, Any]]
+    ) -> Tuple[Dict[str, List[int]], List[str]]:
+        """Get resource positions by lowercased type and lowercased names, built once per details list"""
+        index = self._resource_index
+        if index is None or index[0] is not details:
+            type_buckets: Dict[str, List[int]] = defaultdict(list)
+            for position, resource in enumerate(details):
+                type_buckets[resource.get("type", "").lower()].append(position)
+            names_lower = [resource.get("name", "").lower() for resource in details]
+            index = (details, dict(type_buckets), names_lower)
+            self._resource_index = index
+        return index[1], index[2]
+
     async def _handle_analyze_infrastructure_tool(
         self, tool_input: Dict[str, Any]
     ) -> Dict[str, Any]:
@@ -239,14 +449,8 @@ class TerraformAgent:
                 "outputs": project_data.get("outputs", {}).get("count", 0),
                 "providers": project_data.get("providers", {}).get("count", 0),
             }
-        elif analysis_type == "resources":
-            return project_data.get("resources", {})
-        elif analysis_type == "variables":
-            return project_data.get("variables", {})
-        elif analysis_type == "outputs":
-            return project_data.get("outputs", {})
-        elif analysis_type == "providers":
-            return project_data.get("providers", {})
+        elif analysis_type in _ANALYSIS_SECTIONS:
+            return project_data.get(analysis_type, {})
         else:
             return {"error": f"Unknown analysis type: {analysis_type}"}
 
@@ -271,9 +475,18 @@ class TerraformAgent:
         elif task.status == TaskStatus.RUNNING:
             logger.info(f"Running: {task.intent.original_query}")
 
+    def _invalidate_project_data(self):
+        """Drop the project snapshot and cached state reads"""
+        # Disk-cached answers are keyed by the project data, so they need no clearing
+        self._project_data_dirty = True
+        self._state_read_cache.clear()
+
     def get_project_data(self) -> Dict[str, Any]:
-        """Get project data from task engine"""
-        return self.task_engine.get_project_data()
+        """Get project data from task engine, reusing the snapshot until invalidated"""
+        if self._project_data_dirty or self._project_data is None:
+            self._project_data = self.task_engine.get_project_data()
+            self._project_data_dirty = False
+        return self._project_data
 
     def _build_context_aware_prompt(self, command: str) -> str:
         """Build a context-aware prompt that includes conversation history"""
@@ -288,14 +501,16 @@ class TerraformAgent:
             if self.last_plan_summary:
                 context_parts.append(f"Plan Summary: {self.last_plan_summary}")
 
-        if self.conversation_history:
+        if self._history_roles:
             # Get last few conversation exchanges for context
-            recent_history = self.conversation_history[-4:]  # Last 2 exchanges
-            if recent_history:
-                context_parts.append("\nRecent Conversation:")
-                for msg in recent_history:
-                    role = "User" if msg["role"] == "user" else "Assistant"
-                    context_parts.append(f"{role}: {msg['content'][:100]}...")
+            start = max(0, len(self._history_roles) - 4)  # Last 2 exchanges
+            context_parts.append("\nRecent Conversation:")
+            for role, content in zip(
+                islice(self._history_roles, start, None),
+                islice(self._history_contents, start, None),
+            ):
+                label = "User" if role == "user" else "Assistant"
+                context_parts.append(f"{label}: {content[:100]}...")
 
         context_str = "\n".join(context_parts) if context_parts else "No previous context"
 
@@ -332,56 +547,38 @@ Instructions:
         success = self.last_result.get("success", False)
         return f"Last action: {action}, Success: {success}"
 
-    def _detect_simple_system_command(self, command: str) -> Optional[str]:
-        """Detect only simple system commands that don't need LLM"""
-        command_lower = command.lower().strip()
-
-        # Only handle very basic system commands here
-        if command_lower in ["help", "h"]:
-            return "help"
-        if command_lower == "status":
-            return "status"
-        if command_lower in ["clear", "cls"]:
-            return "clear"
-        if command_lower in ["tokens", "usage"]:
-            return "tokens"
-
-        return None  # Everything else goes to LLM with context
-
-    def _detect_terraform_command(self, command: str) -> Optional[str]:
-        """Detect if command is a terraform operation"""
-        command_lower = command.lower()
-
-        # Terraform command patterns
-        terraform_commands = {
-            "terraform init": "init",
-            "terraform plan": "plan",
-            "terraform apply": "apply",
-            "terraform destroy": "destroy",
-            "terraform validate": "validate",
-            "terraform show": "show",
-            "terraform output": "output",
-            "terraform state list": "state_list",
-            "run terraform plan": "plan",
-            "run terraform apply": "apply",
-            "run terraform destroy": "destroy",
-            "run terraform init": "init",
-            "validate configuration": "validate",
-            "validate terraform": "validate",
-            "show terraform plan": "show",
-            "show terraform state": "state_list",
-            "list terraform state": "state_list",
-            "terraform state": "state_list",
-        }
-
-        for pattern, action in terraform_commands.items():
-            if pattern in command_lower:
-                return action
-
-        return None
+    def _detect_simple_system_command(self, command_lower: str) -> Optional[str]:
+        """Detect only simple system commands that don't need LLM (expects stripped, lowercased input)"""
+        # Only handle very basic system commands here; everything else goes to LLM with context
+        return _SIMPLE_SYSTEM_COMMANDS.get(command_lower)
+
+    def _detect_terraform_command(self, command_lower: str) -> Optional[str]:
+        """Detect if command is a terraform operation (expects lowercased input)"""
+        # Highest-priority phrase found anywhere in the command, in one scan
+        priority = min(
+            (
+                _TERRAFORM_COMMAND_PRIORITY[match.group(1)]
+                for match in _TERRAFORM_COMMAND_RE.finditer(command_lower)
+            ),
+            default=None,
+        )
+        return _TERRAFORM_COMMANDS[priority][1] if priority is not None else None
+
+    async def _execute_terraform_command(
+        self, command: str, action: str
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Execute a terraform command and return (formatted response, raw task-engine result)"""
+        if action in _STATE_READ_ACTIONS:
+            fingerprint = self._state_fingerprint()
+            cached = self._state_read_cache.get(action)
+            if (
+                cached is not None
+                and cached[0] == fingerprint
+                and time.monotonic() - cached[1] < _STATE_READ_CACHE_TTL_SECONDS
+            ):
+                logger.debug(f"Reusing terraform {action} result for unchanged state")
+                return cached[2], cached[3]
 
-    async def _execute_terraform_command(self, command: str, action: str) -> str:
-        """Execute a terraform command and return formatted response"""
         try:
             # Execute the appropriate terraform command
             if action == "init":
@@ -401,243 +598,225 @@ Instructions:
             elif action == "state_list":
                 result = await self.task_engine.execute_terraform_state_list()
             else:
-                return f"Unknown terraform command: {action}"
+                error_msg = f"Unknown terraform command: {action}"
+                return error_msg, {"action": f"terraform_{action}", "success": False, "error": error_msg}
 
             # Format the response
-            return self._format_terraform_result(result, action)
+            response = self._format_terraform_result(result, action)
+            if action in _STATE_READ_ACTIONS and result.get("success"):
+                self._state_read_cache[action] = (fingerprint, time.monotonic(), response, result)
+            return response, result
 
         except Exception as e:
             logger.error(f"Error executing terraform command: {e}")
-            return f"Error executing terraform command: {str(e)}"
+            return (
+                f"Error executing terraform command: {str(e)}",
+                {"action": f"terraform_{action}", "success": False, "error": str(e)},
+            )
+
+    def _state_fingerprint(self) -> Tuple[Optional[int], ...]:
+        """Modification times of the local state file and .terraform directory"""
+        fingerprint = []
+        for name in ("terraform.tfstate", ".terraform"):
+            try:
+                fingerprint.append(os.stat(os.path.join(self.config.terraform_dir, name)).st_mtime_ns)
+            except OSError:
+                fingerprint.append(None)
+        return tuple(fingerprint)
 
     def _format_terraform_result(self, result: Dict[str, Any], action: str) -> str:
         """Format terraform execution result for user display"""
         if result["success"]:
-            response = (
-                f"✅ **Terraform {action.replace('_', ' ').title()} Successful**\n\n"
-            )
+            header = _SUCCESS_HEADERS.get(action)
+            if header is None:
+                header = f"✅ **Terraform {action.replace('_', ' ').title()} Successful**\n\n"
+            parts = [header]
 
-            if action == "plan":
-                response += self._format_plan_result(result)
-            elif action == "apply":
-                response += self._format_apply_result(result)
-            elif action == "destroy":
-                response += self._format_destroy_result(result)
-            elif action == "init":
-                response += self._format_init_result(result)
-            elif action == "validate":
-                response += self._format_validate_result(result)
-            elif action == "show":
-                response += self._format_show_result(result)
-            elif action == "output":
-                response += self._format_output_result(result)
-            elif action == "state_list":
-                response += self._format_state_list_result(result)
-            else:
-                response += self._format_generic_result(result)
+            # Formatters append to the shared parts list; joined once below
+            formatter = self._RESULT_FORMATTERS.get(action, TerraformAgent._format_generic_result)
+            formatter(self, result, parts)
 
             if result.get("duration"):
-                response += f"\n\n**⏱️ Duration:** {result['duration']:.2f} seconds"
+                parts.append(f"\n\n**⏱️ Duration:** {result['duration']:.2f} seconds")
 
         else:
-            response = f"❌ **Terraform {action.replace('_', ' ').title()} Failed**\n\n"
+            header = _FAILURE_HEADERS.get(action)
+            if header is None:
+                header = f"❌ **Terraform {action.replace('_', ' ').title()} Failed**\n\n"
+            parts = [header]
 
             if result.get("error"):
                 error_msg = result["error"]
                 # Extract meaningful error message
                 if isinstance(error_msg, str):
-                    lines = error_msg.split("\n")
-                    for line in lines:
-                        if "Error:" in line or "error:" in line or line.strip():
-                            response += f"**Error:** {line.strip()}\n"
-                            break
+                    # First non-empty line, found without splitting the whole message
+                    if first_line := _NON_EMPTY_LINE_RE.search(error_msg):
+                        parts.append(f"**Error:** {first_line.group(1)}\n")
                 else:
-                    response += f"**Error:** {str(error_msg)}\n"
+                    parts.append(f"**Error:** {str(error_msg)}\n")
 
             # Show only relevant error output, not the full dump
             if result.get("output") and isinstance(result["output"], str):
                 output = result["output"]
                 # Extract key error information
-                error_lines = []
-                for line in output.split("\n"):
-                    if any(
-                        keyword in line.lower()
-                        for keyword in ["error:", "failed", "invalid", "missing"]
-                    ):
-                        if len(error_lines) < 3:  # Limit error lines
-                            error_lines.append(line.strip())
+                error_lines = [
+                    match.group().strip()
+                    for match in islice(_ERROR_LINE_RE.finditer(output), _MAX_ERROR_LINES)
+                ]
 
                 if error_lines:
-                    response += "\n**Details:**\n"
-                    for line in error_lines:
-                        response += f"• {line}\n"
+                    parts.append("\n**Details:**\n")
+                    parts.extend(f"• {line}\n" for line in error_lines)
 
-        return response
+        return "".join(parts)
 
-    def _format_plan_result(self, result: Dict[str, Any]) -> str:
+    def _format_plan_result(self, result: Dict[str, Any], parts: List[str]) -> None:
         """Format terraform plan result with intelligent summary"""
-        response = ""
-
-        if result.get("summary"):
-            summary = result["summary"]
-            response += "**📋 Plan Summary:**\n"
-            response += f"• ➕ Resources to add: {summary.get('add', 0)}\n"
-            response += f"• 🔄 Resources to change: {summary.get('change', 0)}\n"
-            response += f"• 🗑️  Resources to destroy: {summary.get('destroy', 0)}\n\n"
-
-        # Analyze the plan output for meaningful insights
+        summary = result.get("summary")
         output = result.get("output", "")
-        if isinstance(output, str):
-            # Provide intelligent interpretation
-            if summary := result.get("summary", {}):
-                if (
-                    summary.get("add", 0) == 0
-                    and summary.get("change", 0) == 0
-                    and summary.get("destroy", 0) == 0
-                ):
-                    response += "🎉 **Good news!** Your infrastructure is already up-to-date. No changes are needed.\n\n"
-                else:
-                    total_changes = (
-                        summary.get("add", 0)
-                        + summary.get("change", 0)
-                        + summary.get("destroy", 0)
-                    )
-                    response += f"📊 **Analysis:** {total_changes} change{'s' if total_changes != 1 else ''} detected.\n\n"
-
-                    if summary.get("add", 0) > 0:
-                        response += f"🆕 **New Resources:** {summary.get('add', 0)} resources will be created.\n"
-                    if summary.get("change", 0) > 0:
-                        response += f"🔄 **Updates:** {summary.get('change', 0)} resources will be modified.\n"
-                    if summary.get("destroy", 0) > 0:
-                        response += f"🗑️  **Removals:** {summary.get('destroy', 0)} resources will be destroyed.\n"
-
-                    response += "\n💡 **Next Steps:** Review the changes and run 'terraform apply' when ready.\n\n"
-
-            # Extract key information without showing raw output
-            if "Refreshing state" in output:
-                response += "🔄 **State Status:** Infrastructure state refreshed successfully.\n"
-
-            if "No changes" in output:
-                response += "✅ **Status:** Infrastructure matches configuration.\n"
 
-        return response
+        if summary:
+            add = summary.get("add", 0)
+            change = summary.get("change", 0)
+            destroy = summary.get("destroy", 0)
+
+            if not isinstance(output, str):
+                parts.append(
+                    "**📋 Plan Summary:**\n"
+                    f"• ➕ Resources to add: {add}\n"
+                    f"• 🔄 Resources to change: {change}\n"
+                    f"• 🗑️  Resources to destroy: {destroy}\n\n"
+                )
+                return
 
-    def _format_apply_result(self, result: Dict[str, Any]) -> str:
+            if add == change == destroy == 0:
+                # Up-to-date infrastructure is the common case: use the prebuilt text
+                parts.append(_PLAN_NO_CHANGES)
+            else:
+                total_changes = add + change + destroy
+                parts.append(
+                    "**📋 Plan Summary:**\n"
+                    f"• ➕ Resources to add: {add}\n"
+                    f"• 🔄 Resources to change: {change}\n"
+                    f"• 🗑️  Resources to destroy: {destroy}\n\n"
+                    f"📊 **Analysis:** {total_changes} change{'s' if total_changes != 1 else ''} detected.\n\n"
+                )
+                if add > 0:
+                    parts.append(f"🆕 **New Resources:** {add} resources will be created.\n")
+                if change > 0:
+                    parts.append(f"🔄 **Updates:** {change} resources will be modified.\n")
+                if destroy > 0:
+                    parts.append(f"🗑️  **Removals:** {destroy} resources will be destroyed.\n")
+                parts.append("\n💡 **Next Steps:** Review the changes and run 'terraform apply' when ready.\n\n")
+        elif not isinstance(output, str):
+            return
+
+        # Extract key information without showing raw output
+        if "Refreshing state" in output:
+            parts.append("🔄 **State Status:** Infrastructure state refreshed successfully.\n")
+
+        if "No changes" in output:
+            parts.append("✅ **Status:** Infrastructure matches configuration.\n")
+
+    def _format_apply_result(self, result: Dict[str, Any], parts: List[str]) -> None:
         """Format terraform apply result"""
-        response = "**🚀 Apply Summary:**\n"
+        parts.append("**🚀 Apply Summary:**\n")
 
         output = result.get("output", "")
         if isinstance(output, str):
             # Extract key apply information
             if "Apply complete!" in output:
-                response += "✅ **Status:** Infrastructure successfully updated.\n"
+                parts.append("✅ **Status:** Infrastructure successfully updated.\n")
 
             # Count applied resources
-            lines = output.split("\n")
-            applied_count = 0
-            for line in lines:
-                if ":" in line and ("created" in line or "modified" in line):
-                    applied_count += 1
+            applied_count = sum(1 for _ in _APPLIED_LINE_RE.finditer(output))
 
             if applied_count > 0:
-                response += (
+                parts.append(
                     f"📦 **Resources Applied:** {applied_count} resources updated.\n"
                 )
             else:
-                response += "📦 **Resources Applied:** No changes were needed.\n"
+                parts.append("📦 **Resources Applied:** No changes were needed.\n")
 
-        response += "\n🎯 **Result:** Your infrastructure is now synchronized with the configuration.\n"
-        return response + "\n"
+        parts.append("\n🎯 **Result:** Your infrastructure is now synchronized with the configuration.\n\n")
 
-    def _format_destroy_result(self, result: Dict[str, Any]) -> str:
+    def _format_destroy_result(self, result: Dict[str, Any], parts: List[str]) -> None:
         """Format terraform destroy result"""
-        response = "**💥 Destroy Summary:**\n"
+        parts.append("**💥 Destroy Summary:**\n")
 
         output = result.get("output", "")
         if isinstance(output, str):
             if "Destroy complete!" in output:
-                response += "✅ **Status:** Infrastructure successfully destroyed.\n"
-                response += "⚠️  **Warning:** All managed resources have been removed.\n"
+                parts.append("✅ **Status:** Infrastructure successfully destroyed.\n")
+                parts.append("⚠️  **Warning:** All managed resources have been removed.\n")
             else:
-                response += "🔄 **Status:** Infrastructure destruction process.\n"
+                parts.append("🔄 **Status:** Infrastructure destruction process.\n")
 
-        response += "\n🔒 **Security Note:** Double-check that all resources have been properly cleaned up.\n"
-        return response + "\n"
+        parts.append("\n🔒 **Security Note:** Double-check that all resources have been properly cleaned up.\n\n")
 
-    def _format_init_result(self, result: Dict[str, Any]) -> str:
+    def _format_init_result(self, result: Dict[str, Any], parts: List[str]) -> None:
         """Format terraform init result"""
-        response = "**🔧 Initialization Summary:**\n"
+        parts.append("**🔧 Initialization Summary:**\n")
 
         output = result.get("output", "")
         if isinstance(output, str):
             if "Terraform has been successfully initialized!" in output:
-                response += (
+                parts.append(
                     "✅ **Status:** Terraform workspace initialized successfully.\n"
                 )
 
             # Check for provider installations
             if "Installing" in output and "provider" in output:
-                response += "📦 **Providers:** Required providers installed.\n"
+                parts.append("📦 **Providers:** Required providers installed.\n")
 
             if "Backend" in output and "configured" in output:
-                response += "💾 **Backend:** Remote storage configured.\n"
+                parts.append("💾 **Backend:** Remote storage configured.\n")
 
-        response += (
-            "\n🚀 **Ready:** You can now run terraform plan and apply commands.\n"
-        )
-        return response + "\n"
+        parts.append(_INIT_READY)
 
-    def _format_validate_result(self, result: Dict[str, Any]) -> str:
+    def _format_validate_result(self, result: Dict[str, Any], parts: List[str]) -> None:
         """Format terraform validate result"""
-        response = "**✅ Validation Summary:**\n"
-        response += "🔍 **Status:** Configuration syntax is valid.\n"
-        response += "📋 **Result:** No configuration errors found.\n\n"
-        response += (
-            "💡 **Good to go:** Your terraform files are ready for deployment.\n"
-        )
-        return response + "\n"
+        parts.append(_VALIDATE_SUMMARY)
 
-    def _format_show_result(self, result: Dict[str, Any]) -> str:
+    def _format_show_result(self, result: Dict[str, Any], parts: List[str]) -> None:
         """Format terraform show result"""
-        response = "**📊 Current State Summary:**\n"
+        parts.append("**📊 Current State Summary:**\n")
 
         output = result.get("output", "")
         if isinstance(output, str):
             # Count resources in state
             resource_count = output.count('resource "')
             if resource_count > 0:
-                response += (
+                parts.append(
                     f"📦 **Resources in State:** {resource_count} resources managed.\n"
                 )
             else:
-                response += (
+                parts.append(
                     "📦 **Resources in State:** No resources currently managed.\n"
                 )
 
-        response += "\n🔍 **Info:** This shows the current infrastructure state.\n"
-        return response + "\n"
+        parts.append("\n🔍 **Info:** This shows the current infrastructure state.\n\n")
 
-    def _format_output_result(self, result: Dict[str, Any]) -> str:
+    def _format_output_result(self, result: Dict[str, Any], parts: List[str]) -> None:
         """Format terraform output result"""
-        response = "**📤 Output Values:**\n"
+        parts.append("**📤 Output Values:**\n")
 
         output = result.get("output", "")
         if isinstance(output, str):
             # Parse output values
-            lines = output.split("\n")
-            for line in lines:
-                if "=" in line and not line.strip().startswith("#"):
-                    key, value = line.split("=", 1)
-                    response += f"• **{key.strip()}:** {value.strip()}\n"
+            parts.extend(
+                f"• **{key.strip()}:** {value.strip()}\n"
+                for key, value in _OUTPUT_VALUE_RE.findall(output)
+            )
 
         if not output or "=" not in output:
-            response += "📭 **No output values** are currently defined.\n"
+            parts.append("📭 **No output values** are currently defined.\n")
 
-        return response + "\n"
+        parts.append("\n")
 
-    def _format_state_list_result(self, result: Dict[str, Any]) -> str:
+    def _format_state_list_result(self, result: Dict[str, Any], parts: List[str]) -> None:
         """Format terraform state list result"""
-        response = "**📋 State Resources:**\n"
+        parts.append("**📋 State Resources:**\n")
 
         output = result.get("output", "")
 
@@ -645,90 +824,101 @@ Instructions:
         if isinstance(output, list):
             resources = output
         elif isinstance(output, str):
-            resources = [line.strip() for line in output.split("\n") if line.strip()]
+            resources = _NON_EMPTY_LINE_RE.findall(output)
         else:
             resources = []
 
         resource_count = len(resources)
 
         if resource_count > 0:
-            response += (
+            parts.append(
                 f"📦 **Total Resources:** {resource_count} resources in state.\n"
             )
 
             # Show first few as examples
             examples = resources[:5]
             if examples:
-                response += "\n**Sample Resources:**\n"
-                for example in examples:
-                    response += f"• {example}\n"
+                parts.append("\n**Sample Resources:**\n")
+                parts.extend(f"• {example}\n" for example in examples)
 
             if resource_count > 5:
-                response += f"\n... and {resource_count - 5} more resources.\n"
+                parts.append(f"\n... and {resource_count - 5} more resources.\n")
         else:
-            response += "📭 **No resources** found in state.\n"
+            parts.append("📭 **No resources** found in state.\n")
 
-        return response + "\n"
+        parts.append("\n")
 
-    def _format_generic_result(self, result: Dict[str, Any]) -> str:
+    def _format_generic_result(self, result: Dict[str, Any], parts: List[str]) -> None:
         """Format generic terraform result"""
-        response = "**📋 Operation Summary:**\n"
-        response += "✅ **Status:** Command completed successfully.\n"
+        parts.append("**📋 Operation Summary:**\n")
+        parts.append("✅ **Status:** Command completed successfully.\n")
 
         if result.get("duration"):
-            response += f"⏱️ **Duration:** {result['duration']:.2f} seconds\n"
-
-        return response + "\n"
+            parts.append(f"⏱️ **Duration:** {result['duration']:.2f} seconds\n")
+
+        parts.append("\n")
+
+    # Action -> formatter for successful terraform results
+    _RESULT_FORMATTERS = {
+        "plan": _format_plan_result,
+        "apply": _format_apply_result,
+        "destroy": _format_destroy_result,
+        "init": _format_init_result,
+        "validate": _format_validate_result,
+        "show": _format_show_result,
+        "output": _format_output_result,
+        "state_list": _format_state_list_result,
+    }
 
     async def process_command_async(self, command: str) -> str:
         """Process a command asynchronously and return the response"""
-        if not command.strip():
+        # Normalized once and passed to every detector
+        command_lower = command.strip().lower()
+        if not command_lower:
             return ""
 
-        command_lower = command.lower()
-
         # Handle system commands
-        if command_lower in ["exit", "quit", "q"]:
+        if command_lower in _EXIT_COMMANDS:
             self.running = False
             return "exit"
 
         # Check for simple system commands
-        system_cmd = self._detect_simple_system_command(command)
+        system_cmd = self._detect_simple_system_command(command_lower)
         if system_cmd:
             return system_cmd
 
-        if command_lower.startswith("export"):
+        if command_lower.startswith(_PASSTHROUGH_PREFIXES):
             return command
 
-        if command_lower.startswith("import"):
-            return command
+        # Each turn starts from a fresh project snapshot
+        self._project_data_dirty = True
 
         # Add to conversation history
-        self.conversation_history.append({"role": "user", "content": command})
+        self._append_history("user", command)
 
         try:
             # Check if this is a terraform command
-            terraform_action = self._detect_terraform_command(command)
+            terraform_action = self._detect_terraform_command(command_lower)
             if terraform_action:
                 # Execute terraform command asynchronously
-                response = await self._execute_terraform_command(
+                response, raw_result = await self._execute_terraform_command(
                     command, terraform_action
                 )
-                # Update context tracking
+                # Update context tracking from the task engine's own result
                 self.last_command = command
-                self.last_result = self._extract_result_from_response(response, terraform_action)
+                self.last_result = raw_result
                 if terraform_action == "plan":
-                    self.last_plan_summary = self.last_result.get("summary") if self.last_result else None
+                    self.last_plan_summary = raw_result.get("summary")
+                elif terraform_action in _WRITE_ACTIONS:
+                    self._invalidate_project_data()
             else:
                 # Use context-aware LLM processing for ALL non-terraform commands
                 context_prompt = self._build_context_aware_prompt(command)
-                response = await self.ai_processor.process_query(
-                    context_prompt,
-                    project_data=self.get_project_data()
-                )
+                project_data = self.get_project_data()
+                response = await self._process_query_cached(context_prompt, project_data)
 
             # Add to conversation history
-            self.conversation_history.append({"role": "assistant", "content": response})
+            self._append_history("assistant", response)
 
             return response
 
@@ -737,6 +927,28 @@ Instructions:
             logger.error(error_msg)
             return error_msg
 
+    async def _process_query_cached(
+        self, context_prompt: str, project_data: Dict[str, Any]
+    ) -> str:
+        """Answer a prompt through the AI processor, consulting the disk cache first"""
+        if self._response_cache is None:
+            return await self.ai_processor.process_query(
+                context_prompt, project_data=project_data
+            )
+
+        model_info = self.get_model_info()
+        model_id = f"{model_info['provider']}|{model_info['model']}|{self.config.use_deepagents}"
+        cache_key = ResponseCache.make_key(context_prompt, project_data, model_id)
+        response = self._response_cache.get(cache_key)
+        if response is None:
+            response, succeeded = await self.ai_processor.process_query_with_status(
+                context_prompt, project_data=project_data
+            )
+            # Failures are answered as text too; never persist them
+            if succeeded:
+                self._response_cache.set(cache_key, response)
+        return response
+
     # Removed sync process_command method as app uses async version
 
     def is_running(self) -> bool:
@@ -746,50 +958,33 @@ Instructions:
     def stop(self):
         """Stop the agent"""
         self.running = False
+        self._stop_background_loop()
+        if self._response_cache is not None:
+            self._response_cache.close()
+            self._response_cache = None
 
-    def _extract_result_from_response(self, response: str, action: str) -> Optional[Dict[str, Any]]:
-        """Extract structured result from formatted response"""
-        try:
-            # This is a simplified extraction - in a real implementation,
-            # we'd want to store the raw result from the task engine
-            result = {
-                "action": f"terraform_{action}",
-                "success": "✅" in response or "Successful" in response,
-                "summary": {}
-            }
-
-            # Extract summary for plan commands
-            if action == "plan" and "Plan Summary:" in response:
-                # Simple extraction of plan summary
-                import re
-                add_match = re.search(r"Resources to add: (\d+)", response)
-                change_match = re.search(r"Resources to change: (\d+)", response)
-                destroy_match = re.search(r"Resources to destroy: (\d+)", response)
-
-                if add_match or change_match or destroy_match:
-                    result["summary"] = {
-                        "add": int(add_match.group(1)) if add_match else 0,
-                        "change": int(change_match.group(1)) if change_match else 0,
-                        "destroy": int(destroy_match.group(1)) if destroy_match else 0
-                    }
-
-            return result
-        except Exception as e:
-            logger.error(f"Error extracting result from response: {e}")
-            return None
-
-    def get_session_duration(self) -> datetime:
+    def get_session_duration(self) -> timedelta:
         """Get session duration"""
-        return datetime.now() - self.session_start
+        return timedelta(seconds=time.monotonic() - self._session_start_mono)
+
+    def _append_history(self, role: str, content: str):
+        """Record one message in the session history"""
+        self._history_roles.append(role)
+        self._history_contents.append(content)
 
     def get_conversation_history(self) -> List[Dict[str, str]]:
         """Get conversation history"""
-        return self.conversation_history.copy()
+        return [
+            {"role": role, "content": content}
+            for role, content in zip(self._history_roles, self._history_contents)
+        ]
 
     def clear_conversation_history(self):
         """Clear conversation history"""
-        self.conversation_history.clear()
-        self.ai_processor.clear_memory()
+        self._history_roles.clear()
+        self._history_contents.clear()
+        if self._ai_processor is not None:
+            self._ai_processor.clear_memory()
         # Also clear context tracking
         self.last_command = None
         self.last_result = None
@@ -798,8 +993,16 @@ Instructions:
     # Enhanced methods for DeepAgents integration
     
     def get_processor_info(self) -> Dict[str, Any]:
-        """Get information about available AI processors"""
-        return self.ai_processor.get_processor_info()
+        """Get information about available AI processors, without creating them"""
+        if self._ai_processor is None:
+            return {
+                "ai_provider": self.config.ai_provider,
+                "use_deepagents": self.config.use_deepagents,
+                "model_info": self.get_model_info(),
+                "available_processors": [],
+                "initialized": False,
+            }
+        return {**self._ai_processor.get_processor_info(), "initialized": True}
     
     def switch_processor(self, use_deepagents: Optional[bool] = None) -> bool:
         """Switch between standard and DeepAgents processors"""
@@ -894,7 +1097,7 @@ Steps to execute:
     
     def get_model_info(self) -> Dict[str, Any]:
         """Get current model configuration"""
-        return self.ai_processor.get_model_info()
+        return ModelFactory.get_model_info(self.config)
     
     async def test_ai_connection(self) -> Dict[str, Any]:
         """Test connection to configured AI provider"""
@@ -906,10 +1109,12 @@ Steps to execute:
             "agent_status": {
                 "running": self.running,
                 "session_duration": str(self.get_session_duration()),
-                "conversation_count": len(self.conversation_history),
+                "conversation_count": len(self._history_roles),
             },
             "ai_processor": self.get_processor_info(),
-            "deepagents_available": self.ai_processor.supports_deepagents(),
+            "deepagents_available": (
+                self._ai_processor is not None and self._ai_processor.supports_deepagents()
+            ),
             "workflows_available": len(self.get_available_workflows()),
             "hil_status": self.get_hil_status(),
             "model_config": self.get_model_info(),
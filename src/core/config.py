@@ -2,66 +2,157 @@
 Configuration management for Terraform AI Agent
 """
 
+import copy
 import os
 import shutil
+import subprocess
+import time
+from functools import cache, lru_cache
 from pathlib import Path
-from typing import Any, Dict, Optional, List
+from typing import Any, Dict, List, Optional, Tuple
 
+import yaml
 from dotenv import load_dotenv
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, PrivateAttr, field_validator
 
 from src.core.logger import get_logger
-
-# Load environment variables from .env file
-load_dotenv()
+from src.terraform.files import directories_unchanged, list_terraform_files
 
 logger = get_logger(__name__)
 
+# libyaml's C loader when PyYAML was built with it, else the pure-Python one
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# How long a probed `terraform version` stays valid
+_TERRAFORM_VERSION_TTL_SECONDS = 300.0
+
+
+@cache
+def _load_dotenv_once():
+    """Load environment variables from the .env file, once per process (skipped when DZP_NO_DOTENV=1)"""
+    if os.environ.get("DZP_NO_DOTENV") != "1":
+        load_dotenv()
+
+
+def _env_bool(value: str) -> bool:
+    """Parse a true/false environment value"""
+    return value.lower() == "true"
+
+
+# Config field, environment variable and parser, read once per Config()
+_ENV_FIELDS = (
+    ("ai_provider", "AI_PROVIDER", str),
+    ("openai_api_key", "OPENAI_API_KEY", str),
+    ("openai_model", "OPENAI_MODEL", str),
+    ("openai_base_url", "OPENAI_BASE_URL", str),
+    ("openai_max_tokens", "OPENAI_MAX_TOKENS", int),
+    ("openai_compatible_api_key", "OPENAI_COMPATIBLE_API_KEY", str),
+    ("openai_compatible_model", "OPENAI_COMPATIBLE_MODEL", str),
+    ("openai_compatible_base_url", "OPENAI_COMPATIBLE_BASE_URL", str),
+    ("openai_compatible_max_tokens", "OPENAI_COMPATIBLE_MAX_TOKENS", int),
+    ("openai_max_requests_per_minute", "OPENAI_MAX_REQUESTS_PER_MINUTE", int),
+    ("openai_max_tokens_per_minute", "OPENAI_MAX_TOKENS_PER_MINUTE", int),
+    ("use_deepagents", "USE_DEEPAGENTS", _env_bool),
+    ("human_in_the_loop", "HUMAN_IN_THE_LOOP", _env_bool),
+    ("terraform_path", "TERRAFORM_PATH", str),
+    ("terraform_workspace", "TERRAFORM_WORKSPACE", str),
+    ("log_level", "LOG_LEVEL", str),
+    ("log_file", "LOG_FILE", str),
+    ("max_file_size", "MAX_FILE_SIZE", int),
+    ("history_turns", "HISTORY_TURNS", int),
+    ("max_history", "MAX_HISTORY", int),
+    ("response_cache_size", "RESPONSE_CACHE_SIZE", int),
+    ("response_cache_dir", "RESPONSE_CACHE_DIR", str),
+    ("response_cache_ttl", "RESPONSE_CACHE_TTL", int),
+    ("ui_theme", "UI_THEME", str),
+    ("auto_refresh", "AUTO_REFRESH", _env_bool),
+    ("refresh_interval", "REFRESH_INTERVAL", int),
+)
+
+
+@lru_cache(maxsize=8)
+def _load_project_config(path: str, mtime_ns: int) -> Dict[str, Any]:
+    """Parse a project config file; mtime_ns keys the cache to the file's version"""
+    with open(path) as f:
+        data = yaml.load(f, Loader=_YAML_LOADER)
+    return data if isinstance(data, dict) else {}
+
+
+@lru_cache(maxsize=8)
+def _find_terraform(terraform_path: str) -> Optional[str]:
+    """Resolve the Terraform CLI on PATH once per path (shared by validation and check_terraform)"""
+    return shutil.which(terraform_path)
+
+
+@lru_cache(maxsize=8)
+def _has_terraform_entries(directory: str, mtime_ns: int) -> bool:
+    """Whether directory holds .terraform, terraform.tfstate or a .tf/.tfvars file"""
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                name = entry.name
+                if name in (".terraform", "terraform.tfstate"):
+                    return True
+                if name.endswith((".tf", ".tfvars")) and not name.startswith("."):
+                    return True
+    except OSError:
+        pass
+    return False
+
 
 class Config(BaseModel):
     """Application configuration with validation"""
 
     # AI Provider Configuration
-    ai_provider: str = Field("openai_compatible", env="AI_PROVIDER")
-
-    # Claude/Anthropic Configuration (deprecated)
-    anthropic_api_key: Optional[str] = Field(None, env="ANTHROPIC_API_KEY")
-    anthropic_model: str = Field("claude-3-5-sonnet-20241022", env="ANTHROPIC_MODEL")
-    anthropic_max_tokens: int = Field(4096, env="ANTHROPIC_MAX_TOKENS")
+    ai_provider: str = "openai_compatible"
 
     # OpenAI Configuration
-    openai_api_key: Optional[str] = Field(None, env="OPENAI_API_KEY")
-    openai_model: str = Field("gpt-4o", env="OPENAI_MODEL")
-    openai_base_url: str = Field("https://api.openai.com/v1", env="OPENAI_BASE_URL")
-    openai_max_tokens: int = Field(4096, env="OPENAI_MAX_TOKENS")
+    openai_api_key: Optional[str] = None
+    openai_model: str = "gpt-4o"
+    openai_base_url: str = "https://api.openai.com/v1"
+    openai_max_tokens: int = 4096
 
     # OpenAI Compatible Configuration
-    openai_compatible_api_key: Optional[str] = Field(None, env="OPENAI_COMPATIBLE_API_KEY")
-    openai_compatible_model: str = Field("llama3.1", env="OPENAI_COMPATIBLE_MODEL")
-    openai_compatible_base_url: str = Field("http://localhost:11434/v1", env="OPENAI_COMPATIBLE_BASE_URL")
-    openai_compatible_max_tokens: int = Field(4096, env="OPENAI_COMPATIBLE_MAX_TOKENS")
+    openai_compatible_api_key: Optional[str] = None
+    openai_compatible_model: str = "llama3.1"
+    openai_compatible_base_url: str = "http://localhost:11434/v1"
+    openai_compatible_max_tokens: int = 4096
+    openai_max_requests_per_minute: int = 0  # 0 = unlimited
+    openai_max_tokens_per_minute: int = 0  # 0 = unlimited
 
     # DeepAgents Configuration
-    use_deepagents: bool = Field(False, env="USE_DEEPAGENTS")
-    human_in_the_loop: bool = Field(True, env="HUMAN_IN_THE_LOOP")
+    use_deepagents: bool = False
+    human_in_the_loop: bool = True
 
     # Terraform Configuration
-    terraform_path: str = Field("terraform", env="TERRAFORM_PATH")
-    terraform_workspace: str = Field("default", env="TERRAFORM_WORKSPACE")
+    terraform_path: str = Field("terraform", validate_default=True)
+    terraform_workspace: str = "default"
 
     # Application Configuration
-    log_level: str = Field("INFO", env="LOG_LEVEL")
-    log_file: Optional[str] = Field(None, env="LOG_FILE")
-    max_file_size: int = Field(10 * 1024 * 1024, env="MAX_FILE_SIZE")  # 10MB
+    log_level: str = "INFO"
+    log_file: Optional[str] = None
+    max_file_size: int = 10 * 1024 * 1024  # 10MB
+    history_turns: int = 6  # Exchanges kept in processor memory
+    max_history: int = 200  # Messages kept in the agent's session history
+    response_cache_size: int = 1024  # 0 disables caching
+    response_cache_dir: Optional[str] = None  # Unset disables the disk cache
+    response_cache_ttl: int = 3600
 
     # UI Configuration
-    ui_theme: str = Field("dark", env="UI_THEME")
-    auto_refresh: bool = Field(True, env="AUTO_REFRESH")
-    refresh_interval: int = Field(30, env="REFRESH_INTERVAL")
+    ui_theme: str = "dark"
+    auto_refresh: bool = True
+    refresh_interval: int = 30
 
     # Project Configuration
-    project_root: Optional[str] = Field(None, env="PROJECT_ROOT")
-    terraform_dir: str = Field(".", env="TERRAFORM_DIR")
+    project_root: Optional[str] = None
+    terraform_dir: str = "."
+
+    # Last probed `terraform version` and when it was read
+    _terraform_version: Optional[str] = PrivateAttr(None)
+    _terraform_version_checked_at: Optional[float] = PrivateAttr(None)
+
+    # (terraform_dir, scanned directory mtimes, sorted files) from the last walk
+    _terraform_files_cache: Optional[Tuple[str, Dict[str, int], List[str]]] = PrivateAttr(None)
 
     class Config:
         env_file_encoding = "utf-8"
@@ -90,68 +181,69 @@ class Config(BaseModel):
     @classmethod
     def validate_terraform_path(cls, v: str) -> str:
         """Validate Terraform CLI path"""
-        if not shutil.which(v):
+        if not _find_terraform(v):
             logger.warning(f"Terraform CLI not found at '{v}'. Please ensure Terraform is installed.")
         return v
 
+    @field_validator("history_turns")
+    @classmethod
+    def validate_history_turns(cls, v: int) -> int:
+        """Validate processor memory size (0 keeps no previous exchanges)"""
+        if v < 0:
+            logger.warning(f"Invalid HISTORY_TURNS '{v}'. Must not be negative, using 0")
+            return 0
+        return v
+
+    @field_validator("max_history")
+    @classmethod
+    def validate_max_history(cls, v: int) -> int:
+        """Validate session history bound (the latest exchange must always fit)"""
+        if v < 1:
+            logger.warning(f"Invalid MAX_HISTORY '{v}'. Must be at least 1, using 1")
+            return 1
+        return v
+
     def __init__(self, **data):
-        # Explicitly read environment variables
+        _load_dotenv_once()
+
+        # Explicitly read environment variables; unset ones fall back to field defaults
         env_data = {
-            "ai_provider": os.getenv("AI_PROVIDER", "openai_compatible"),
-            "anthropic_api_key": os.getenv("ANTHROPIC_API_KEY"),
-            "anthropic_model": os.getenv(
-                "ANTHROPIC_MODEL", "claude-3-5-sonnet-20241022"
-            ),
-            "anthropic_max_tokens": int(os.getenv("ANTHROPIC_MAX_TOKENS", "4096")),
-            "openai_api_key": os.getenv("OPENAI_API_KEY"),
-            "openai_model": os.getenv("OPENAI_MODEL", "gpt-4o"),
-            "openai_base_url": os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1"),
-            "openai_max_tokens": int(os.getenv("OPENAI_MAX_TOKENS", "4096")),
-            "openai_compatible_api_key": os.getenv("OPENAI_COMPATIBLE_API_KEY"),
-            "openai_compatible_model": os.getenv("OPENAI_COMPATIBLE_MODEL", "llama3.1"),
-            "openai_compatible_base_url": os.getenv("OPENAI_COMPATIBLE_BASE_URL", "http://localhost:11434/v1"),
-            "openai_compatible_max_tokens": int(os.getenv("OPENAI_COMPATIBLE_MAX_TOKENS", "4096")),
-            "use_deepagents": os.getenv("USE_DEEPAGENTS", "false").lower() == "true",
-            "human_in_the_loop": os.getenv("HUMAN_IN_THE_LOOP", "true").lower() == "true",
-            "terraform_path": os.getenv("TERRAFORM_PATH", "terraform"),
-            "terraform_workspace": os.getenv("TERRAFORM_WORKSPACE", "default"),
-            "log_level": os.getenv("LOG_LEVEL", "INFO"),
-            "log_file": os.getenv("LOG_FILE"),
-            "max_file_size": int(os.getenv("MAX_FILE_SIZE", str(10 * 1024 * 1024))),
-            "ui_theme": os.getenv("UI_THEME", "dark"),
-            "auto_refresh": os.getenv("AUTO_REFRESH", "true").lower() == "true",
-            "refresh_interval": int(os.getenv("REFRESH_INTERVAL", "30")),
-            "project_root": os.getenv("PROJECT_ROOT"),
-            "terraform_dir": os.getenv("TERRAFORM_DIR", "."),
+            field: cast(value)
+            for field, env_var, cast in _ENV_FIELDS
+            if (value := os.environ.get(env_var)) is not None
         }
 
+        # Project root defaults to the current directory
+        env_data["project_root"] = os.getenv("PROJECT_ROOT") or str(Path.cwd())
+
+        # IMPORTANT: Use terraform_dir directly from .env without modification
+        # The .env file should contain the absolute path to the terraform directory,
+        # falling back to the current directory if not specified
+        terraform_dir = os.getenv("TERRAFORM_DIR")
+        env_data["terraform_dir"] = (
+            terraform_dir if terraform_dir and terraform_dir != "." else str(Path.cwd())
+        )
+
         # Merge with provided data
         merged_data = {**env_data, **data}
         super().__init__(**merged_data)
 
-        # Set project root if not specified
-        if not self.project_root:
-            self.project_root = str(Path.cwd())
-
-        # IMPORTANT: Use terraform_dir directly from .env without modification
-        # The .env file should contain the absolute path to the terraform directory
-        terraform_dir_from_env = os.getenv("TERRAFORM_DIR")
-        if terraform_dir_from_env and terraform_dir_from_env != ".":
-            # Use the exact path from .env file
-            self.terraform_dir = terraform_dir_from_env
-        else:
-            # Fallback to current directory if not specified
-            self.terraform_dir = str(Path.cwd())
-
     def check_terraform(self) -> bool:
-        """Check if Terraform CLI is available"""
-        return shutil.which(self.terraform_path) is not None
+        """Check if Terraform CLI is available (cached)"""
+        return _find_terraform(self.terraform_path) is not None
 
     def get_terraform_version(self) -> Optional[str]:
-        """Get Terraform version"""
+        """Get Terraform version (cached for a few minutes)"""
+        now = time.monotonic()
+        checked_at = self._terraform_version_checked_at
+        if checked_at is None or now - checked_at >= _TERRAFORM_VERSION_TTL_SECONDS:
+            self._terraform_version = self._read_terraform_version()
+            self._terraform_version_checked_at = now
+        return self._terraform_version
+
+    def _read_terraform_version(self) -> Optional[str]:
+        """Run `terraform version` and extract the version number"""
         try:
-            import subprocess
-
             result = subprocess.run(
                 [self.terraform_path, "version"],
                 capture_output=True,
@@ -170,36 +262,40 @@ class Config(BaseModel):
     def get_project_config(self) -> Dict[str, Any]:
         """Get project-specific configuration"""
         config_file = Path(self.project_root) / ".tf-agent.yml"
-        if config_file.exists():
-            import yaml
-
-            with open(config_file) as f:
-                return yaml.safe_load(f) or {}
-        return {}
+        try:
+            mtime_ns = config_file.stat().st_mtime_ns
+        except FileNotFoundError:
+            return {}
+        # Parsed once per file version; callers get their own deep copy so
+        # mutating nested values can't leak into later reads
+        return copy.deepcopy(_load_project_config(str(config_file), mtime_ns))
 
     def is_terraform_project(self) -> bool:
         """Check if current directory is a Terraform project"""
-        terraform_files = [".terraform", "*.tf", "*.tfvars", "terraform.tfstate"]
-
-        terraform_path = Path(self.terraform_dir)
-        for pattern in terraform_files:
-            if list(terraform_path.glob(pattern)):
-                return True
-        return False
+        try:
+            mtime_ns = os.stat(self.terraform_dir).st_mtime_ns
+        except OSError:
+            return False
+        # Adding or removing entries updates the directory mtime, invalidating the cache
+        return _has_terraform_entries(self.terraform_dir, mtime_ns)
 
     def get_terraform_files(self) -> list:
         """Get all Terraform files in the project"""
-        terraform_path = Path(self.terraform_dir)
-        tf_files = []
-
-        # Find all .tf files
-        for tf_file in terraform_path.rglob("*.tf"):
-            if tf_file.is_file():
-                tf_files.append(str(tf_file))
-
-        # Find .tfvars files
-        for tfvars_file in terraform_path.rglob("*.tfvars"):
-            if tfvars_file.is_file():
-                tf_files.append(str(tfvars_file))
-
-        return sorted(tf_files)
+        # Adding, removing or renaming a file changes its directory's mtime, so
+        # one stat per directory proves the cached listing is still current
+        cached = self._terraform_files_cache
+        if (
+            cached is not None
+            and cached[0] == self.terraform_dir
+            and directories_unchanged(cached[1])
+        ):
+            return list(cached[2])
+
+        # .tf and .tfvars files in one pass over the tree
+        directory_mtimes: Dict[str, int] = {}
+        tf_files = list_terraform_files(
+            self.terraform_dir, (".tf", ".tfvars"), directory_mtimes
+        )
+        tf_files.sort()
+        self._terraform_files_cache = (self.terraform_dir, directory_mtimes, tf_files)
+        return list(tf_files)
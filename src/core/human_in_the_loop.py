@@ -2,7 +2,9 @@
 Human-in-the-Loop approval system for critical operations
 """
 
-import asyncio
+import itertools
+import re
+import time
 from typing import Any, Dict, Optional, Tuple
 from enum import Enum
 
@@ -18,6 +20,20 @@ from src.core.logger import get_logger
 logger = get_logger(__name__)
 console = Console()
 
+# Tools that always require approval
+_CRITICAL_OPERATIONS = frozenset({
+    "execute_terraform_apply",
+    "execute_terraform_destroy",
+    "terraform_apply",
+    "terraform_destroy",
+})
+
+# Production environment names as whole words; "_" and "-" count as separators
+# so "prod_vpc" matches while "domain" or "product" do not
+_PRODUCTION_RE = re.compile(
+    r"(?<![a-z0-9])(?:prod|production|live|main|master)(?![a-z0-9])", re.IGNORECASE
+)
+
 
 class ApprovalStatus(Enum):
     """Approval status enum"""
@@ -34,6 +50,11 @@ class HumanInTheLoop:
         self.config = config
         self.pending_approvals: Dict[str, Dict[str, Any]] = {}
         self.approval_history: list[Dict[str, Any]] = []
+        # Monotonic sequence so ids stay unique after pending approvals are cleared
+        self._approval_ids = itertools.count(1)
+        # Running totals over approval_history for get_approval_summary
+        self._status_counts: Dict[ApprovalStatus, int] = dict.fromkeys(ApprovalStatus, 0)
+        self._high_risk_count = 0
 
     def requires_approval(self, tool_name: str, tool_input: Dict[str, Any]) -> bool:
         """
@@ -49,26 +70,15 @@ class HumanInTheLoop:
         if not self.config.human_in_the_loop:
             return False
 
-        # Define critical operations that require approval
-        critical_operations = {
-            "execute_terraform_apply",
-            "execute_terraform_destroy",
-            "terraform_apply",
-            "terraform_destroy",
-        }
+        if tool_name in _CRITICAL_OPERATIONS:
+            return True
 
         # Additional checks for production environments
-        production_indicators = [
-            "prod", "production", "live", "main", "master"
-        ]
-        
-        is_production = any(
-            indicator in str(tool_input).lower() 
-            for indicator in production_indicators
+        return any(
+            _PRODUCTION_RE.search(value if isinstance(value, str) else str(value))
+            for value in tool_input.values()
         )
 
-        return tool_name in critical_operations or is_production
-
     async def request_approval(
         self, 
         tool_name: str, 
@@ -86,7 +96,7 @@ class HumanInTheLoop:
         Returns:
             Tuple of (approval_status, modified_input)
         """
-        approval_id = f"{tool_name}_{len(self.pending_approvals)}"
+        approval_id = f"{tool_name}_{next(self._approval_ids)}"
         
         approval_request = {
             "id": approval_id,
@@ -94,7 +104,7 @@ class HumanInTheLoop:
             "tool_input": tool_input,
             "context": context or {},
             "status": ApprovalStatus.PENDING,
-            "timestamp": str(asyncio.get_event_loop().time()),
+            "timestamp": time.monotonic(),
             "risk_level": self._assess_risk_level(tool_name, tool_input),
         }
 
@@ -110,11 +120,18 @@ class HumanInTheLoop:
         approval_request["modified_input"] = modified_input
         
         # Move to history
-        self.approval_history.append(approval_request)
-        del self.pending_approvals[approval_id]
+        self._record_history(approval_request)
+        self.pending_approvals.pop(approval_id, None)
         
         return approval_status, modified_input
 
+    def _record_history(self, approval: Dict[str, Any]):
+        """Append a decided approval to history and update the summary counts"""
+        self.approval_history.append(approval)
+        self._status_counts[approval["status"]] += 1
+        if approval.get("risk_level") == "HIGH":
+            self._high_risk_count += 1
+
     def _assess_risk_level(self, tool_name: str, tool_input: Dict[str, Any]) -> str:
         """Assess the risk level of an operation"""
         if "destroy" in tool_name.lower():
@@ -230,7 +247,7 @@ class HumanInTheLoop:
             
             if should_approve:
                 approval["status"] = ApprovalStatus.APPROVED
-                self.approval_history.append(approval)
+                self._record_history(approval)
                 del self.pending_approvals[approval_id]
                 approved_count += 1
         
@@ -241,10 +258,10 @@ class HumanInTheLoop:
         """Get summary of approval activity"""
         return {
             "pending_count": len(self.pending_approvals),
-            "total_approved": len([a for a in self.approval_history if a["status"] == ApprovalStatus.APPROVED]),
-            "total_rejected": len([a for a in self.approval_history if a["status"] == ApprovalStatus.REJECTED]),
-            "total_modified": len([a for a in self.approval_history if a["status"] == ApprovalStatus.MODIFIED]),
-            "high_risk_operations": len([a for a in self.approval_history if a.get("risk_level") == "HIGH"]),
+            "total_approved": self._status_counts[ApprovalStatus.APPROVED],
+            "total_rejected": self._status_counts[ApprovalStatus.REJECTED],
+            "total_modified": self._status_counts[ApprovalStatus.MODIFIED],
+            "high_risk_operations": self._high_risk_count,
         }
 
 
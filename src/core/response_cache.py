@@ -0,0 +1,81 @@
+"""
+Disk-backed cache of AI responses for Terraform AI Agent
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from src.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ResponseCache:
+    """SQLite store of AI responses keyed by prompt and project data fingerprint"""
+
+    def __init__(self, cache_dir: str, ttl: int = 3600):
+        self.ttl = ttl
+        self._db: Optional[sqlite3.Connection] = None
+        try:
+            path = Path(cache_dir).expanduser()
+            path.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(path / "responses.db")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, response TEXT NOT NULL, expires REAL NOT NULL)"
+            )
+            self._db.execute("DELETE FROM responses WHERE expires <= ?", (time.time(),))
+            self._db.commit()
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Disk response cache disabled, cannot open {cache_dir}: {e}")
+            self.close()
+
+    @staticmethod
+    def make_key(prompt: str, project_data: Dict[str, Any], model_id: str) -> str:
+        """Hash the model identity and prompt together with a canonical dump of the project data"""
+        fingerprint = hashlib.blake2b(
+            json.dumps(project_data, sort_keys=True, default=str).encode(), digest_size=16
+        ).hexdigest()
+        return hashlib.blake2b(
+            f"{model_id}|{fingerprint}|{prompt}".encode(), digest_size=16
+        ).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Get a cached response, or None if missing, expired or unreadable"""
+        if self._db is None:
+            return None
+        try:
+            row = self._db.execute(
+                "SELECT response FROM responses WHERE key = ? AND expires > ?",
+                (key, time.time()),
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Disk response cache read failed: {e}")
+            return None
+        if row is not None:
+            logger.debug("Disk response cache hit")
+            return row[0]
+        return None
+
+    def set(self, key: str, response: str):
+        """Store a response until the TTL elapses; failures only skip caching"""
+        if self._db is None:
+            return
+        try:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, response, expires) VALUES (?, ?, ?)",
+                (key, response, time.time() + self.ttl),
+            )
+            self._db.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Disk response cache write failed: {e}")
+
+    def close(self):
+        """Close the database connection"""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -3,6 +3,9 @@ Simplified task execution engine for processing and executing user requests
 Now uses LangChain for NLP processing instead of custom NLP processor
 """
 
+import os
+import time
+import uuid
 from dataclasses import dataclass
 from enum import Enum
 from typing import Any, Callable, Dict, List, Optional
@@ -10,6 +13,7 @@ from typing import Any, Callable, Dict, List, Optional
 from src.core.config import Config
 from src.core.logger import get_logger
 from src.terraform.cli import TerraformCLI
+from src.terraform.files import directories_unchanged, list_terraform_files
 from src.terraform.parser import TerraformParser
 
 logger = get_logger(__name__)
@@ -52,10 +56,10 @@ class TaskEngine:
         self.tasks: Dict[str, Task] = {}
         self.task_callbacks: List[Callable[[Task], None]] = []
 
-        # Cache for parsed project
+        # Cache for parsed project, valid while the files and directories keep their mtimes
         self._project_cache: Optional[Dict[str, Any]] = None
-        self._cache_timestamp: Optional[float] = None
-        self._cache_ttl = 60  # seconds
+        self._cache_directory_mtimes: Dict[str, int] = {}
+        self._cache_file_mtimes: Dict[str, int] = {}
 
     def add_task_callback(self, callback: Callable[[Task], None]):
         """Add callback for task status updates"""
@@ -69,30 +73,45 @@ class TaskEngine:
             except Exception as e:
                 logger.error(f"Task callback failed: {e}")
 
-    def get_project_data(self, force_refresh: bool = False) -> Dict[str, Any]:
-        """Get parsed project data with caching"""
-        import time
-
-        current_time = time.time()
+    def _project_unchanged(self) -> bool:
+        """Whether no Terraform file was added, removed or modified since the last parse"""
+        # Nothing recorded means the directory was missing or unreadable; check again
+        if not self._cache_directory_mtimes:
+            return False
+        if not directories_unchanged(self._cache_directory_mtimes):
+            return False
+        try:
+            return all(
+                os.stat(path).st_mtime_ns == mtime_ns
+                for path, mtime_ns in self._cache_file_mtimes.items()
+            )
+        except OSError:
+            return False
 
-        if (
-            force_refresh
-            or self._project_cache is None
-            or self._cache_timestamp is None
-            or current_time - self._cache_timestamp > self._cache_ttl
-        ):
+    def get_project_data(self, force_refresh: bool = False) -> Dict[str, Any]:
+        """Get parsed project data, re-parsing only when the project changed"""
+        if force_refresh or self._project_cache is None or not self._project_unchanged():
+            # Record mtimes before parsing so a concurrent edit is picked up next time
+            directory_mtimes: Dict[str, int] = {}
+            file_mtimes: Dict[str, int] = {}
+            tf_files = list_terraform_files(
+                self.parser.terraform_dir, directory_mtimes=directory_mtimes
+            )
+            for path in tf_files:
+                try:
+                    file_mtimes[path] = os.stat(path).st_mtime_ns
+                except OSError:
+                    pass
 
             logger.info("Parsing Terraform project")
             self._project_cache = self.parser.parse_project()
-            self._cache_timestamp = current_time
+            self._cache_directory_mtimes = directory_mtimes
+            self._cache_file_mtimes = file_mtimes
 
         return self._project_cache
 
     def create_task(self, query: str) -> Task:
         """Create a new task from user query"""
-        import time
-        import uuid
-
         # Create task
         task_id = str(uuid.uuid4())
         task = Task(
@@ -125,8 +144,6 @@ class TaskEngine:
             task.error = str(e)
             task.status = TaskStatus.FAILED
 
-        import time
-
         task.completed_at = time.time()
         self._notify_task_update(task)
 
@@ -5,6 +5,7 @@ Terraform CLI integration module
 import asyncio
 import json
 import re
+import time
 from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
@@ -81,8 +82,6 @@ class TerraformCLI:
         input_text: Optional[str] = None,
     ) -> TerraformResult:
         """Run a Terraform command asynchronously"""
-        import time
-
         start_time = time.time()
 
         full_command = [self.terraform_path] + command
@@ -0,0 +1,67 @@
+"""
+Terraform file discovery
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from src.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def list_terraform_files(
+    root: Union[str, Path],
+    suffixes: Tuple[str, ...] = (".tf",),
+    directory_mtimes: Optional[Dict[str, int]] = None,
+) -> List[str]:
+    """
+    List files under root whose names end with one of suffixes
+
+    Walks the tree with os.scandir in a single pass, skipping hidden
+    directories such as .terraform and .git and not following directory
+    symlinks. Paths are formatted like str(Path) results, e.g. "main.tf"
+    rather than "./main.tf" for the current directory.
+
+    Args:
+        root: Directory to search
+        suffixes: File name endings to match
+        directory_mtimes: Optional mapping filled with the st_mtime_ns of
+            every directory scanned, for detecting later changes
+
+    Returns:
+        Matching file paths in traversal order
+    """
+    files = []
+    stack = [os.fspath(Path(root))]
+
+    while stack:
+        directory = stack.pop()
+        try:
+            if directory_mtimes is not None:
+                directory_mtimes[directory] = os.stat(directory).st_mtime_ns
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    path = entry.name if directory == "." else entry.path
+                    if entry.is_dir(follow_symlinks=False):
+                        if not entry.name.startswith("."):
+                            stack.append(path)
+                    elif entry.name.endswith(suffixes) and entry.is_file():
+                        files.append(path)
+        except OSError as e:
+            logger.debug(f"Skipping unreadable directory {directory}: {e}")
+
+    return files
+
+
+def directories_unchanged(directory_mtimes: Dict[str, int]) -> bool:
+    """Whether every directory recorded by list_terraform_files still has the same mtime"""
+    try:
+        return all(
+            os.stat(directory).st_mtime_ns == mtime_ns
+            for directory, mtime_ns in directory_mtimes.items()
+        )
+    except OSError:
+        return False
+
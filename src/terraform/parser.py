@@ -9,6 +9,7 @@ from typing import Any, Dict, List, Optional
 from hcl2 import loads as hcl_loads
 
 from src.core.logger import get_logger
+from src.terraform.files import list_terraform_files
 
 logger = get_logger(__name__)
 
@@ -80,11 +81,8 @@ class TerraformParser:
         self.data_sources.clear()
 
         # Find all .tf files
-        tf_files = list(self.terraform_dir.rglob("*.tf"))
-
-        for tf_file in tf_files:
-            if tf_file.is_file():
-                self._parse_file(tf_file)
+        for tf_file in list_terraform_files(self.terraform_dir):
+            self._parse_file(Path(tf_file))
 
         return self.get_project_summary()
 
@@ -267,12 +267,18 @@ Type [#4ECDC4]exit[/#4ECDC4] to quit
         processor_names = [proc["name"] for proc in available_processors]
         active_processor = agent_status.get("deepagents_available", False)
         
-        processor_status = "✅ DeepAgents" if active_processor else "✅ OpenAI Compatible"
-        processor_color = "#00D4AA" if active_processor else "#4ECDC4"
+        processor_initialized = processor_info.get("initialized", True)
+        
+        if not processor_initialized:
+            processor_status = "⏳ Pending"
+            processor_color = "#FFD93D"
+        else:
+            processor_status = "✅ DeepAgents" if active_processor else "✅ OpenAI Compatible"
+            processor_color = "#00D4AA" if active_processor else "#4ECDC4"
         
         table.add_row(
             "⚙️  Processors",
-            f"{', '.join(processor_names)}",
+            f"{', '.join(processor_names)}" if processor_initialized else "Not initialized",
             f"[{processor_color}]{processor_status}[/{processor_color}]"
         )
         
@@ -283,6 +289,9 @@ Type [#4ECDC4]exit[/#4ECDC4] to quit
         if deepagents_available:
             da_status = f"✅ {workflows_count} workflows"
             da_color = "#95E77E"
+        elif not processor_initialized and processor_info.get("use_deepagents"):
+            da_status = "⏳ Pending"
+            da_color = "#FFD93D"
         else:
             da_status = "⚠️ Disabled"
             da_color = "#FFD93D"